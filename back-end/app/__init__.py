@@ -8,6 +8,11 @@ from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager
 from flask_mail import Mail, Message
 from app.messaging.models import Conversation, Message
+from app.messaging.presence import presence
+from app.messaging.ingest import message_ingestor
+from app.messaging.membership import conversation_members
+from app.auth.student_index import student_records_index
+from app.utils.cache import user_summaries
 from flask import Flask, current_app, jsonify, request
 from flask_socketio import SocketIO, join_room, leave_room
 
@@ -16,12 +21,9 @@ from flask_socketio import SocketIO, join_room, leave_room
 jwt = JWTManager()
 socketio = SocketIO(
     cors_allowed_origins="*",  # Replace with your frontend URL in production
-    async_mode="threading",  # Use threading mode
     logger=False,  # Enable logging
     engineio_logger=False,  # Enable engine.io logging
 )
-# Dictionary to track online users
-online_users = {}
 mail = Mail()
 load_dotenv()
 
@@ -69,7 +71,15 @@ def create_app(config_name=None):
 
     # Initialize extensions
     jwt.init_app(app)
-    socketio.init_app(app, cors_allowed_origins="*")
+    socketio.init_app(
+        app,
+        cors_allowed_origins="*",
+        async_mode=app.config.get("SOCKETIO_ASYNC_MODE", "threading"),
+        message_queue=app.config.get("SOCKETIO_MESSAGE_QUEUE"),
+    )
+    presence.init_app(app)
+    message_ingestor.init_app(app)
+    student_records_index.init_app(app)
 
     # Register blueprints
     from app.auth.routes import auth_bp
@@ -97,6 +107,22 @@ def create_app(config_name=None):
     app.register_blueprint(messaging_bp, url_prefix="/api")
     app.register_blueprint(connections_bp, url_prefix="/connections")
 
+    # Index management
+    from app.models.indexes import indexes_cli, sync_indexes
+
+    app.cli.add_command(indexes_cli)
+
+    if app.config.get("ENSURE_INDEXES"):
+        try:
+            report = sync_indexes()
+            app.logger.info(
+                f"Indexes synced: {len(report['created'])} created, "
+                f"{len(report['conflicts'])} conflicts, "
+                f"{len(report['unused'])} unused"
+            )
+        except Exception as e:
+            app.logger.error(f"Error syncing indexes: {e}")
+
     # Setup error handlers
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
@@ -115,6 +141,8 @@ def create_app(config_name=None):
     # Register shutdown handlers
     def shutdown_server():
         app.logger.info("Server shutting down...")
+        # Write any socket messages still buffered
+        message_ingestor.flush()
 
     atexit.register(shutdown_server)
     signal.signal(signal.SIGTERM, lambda sig, frame: shutdown_server())
@@ -147,36 +175,63 @@ def create_app(config_name=None):
     # Socket.IO event handlers
     @socketio.on("connect")
     def handle_connect():
+        presence.start_refresher(socketio)
+        message_ingestor.start(socketio)
         app.logger.info("Client connected")
 
     @socketio.on("disconnect")
     def handle_disconnect():
-        # Remove user from online users
-        for user_email, sid in list(online_users.items()):
-            if sid == request.sid:
-                del online_users[user_email]
-                socketio.emit(
-                    "user_status",
-                    {"email": user_email, "status": "online"},
-                    to="/",  # Broadcast to all connections
-                )
-                app.logger.info(f"User {user_email} disconnected")
-                break
+        conversation_members.unbind_session(request.sid)
 
-    @socketio.on("login")
-    def handle_login(data):
-        user_email = data.get("email")
+        # Only announce once the user's last session is gone
+        user_email = presence.disconnect(request.sid)
         if user_email:
-            # Store user's socket ID
-            online_users[user_email] = request.sid
-            # Notify others that user is online
             socketio.emit(
                 "user_status",
-                {"email": user_email, "status": "online"},
+                {"email": user_email, "status": "offline"},
                 to="/",  # Broadcast to all connections
             )
+            app.logger.info(f"User {user_email} disconnected")
+
+    @socketio.on("login")
+    def handle_login(data):
+        user_email = data.get("email")
+        if user_email:
+            # Remember who owns this socket for later joins and sends
+            conversation_members.bind_session(request.sid, user_email)
+
+            # Record the session in the shared presence store
+            if presence.connect(request.sid, user_email):
+                # Notify others that user is online
+                socketio.emit(
+                    "user_status",
+                    {"email": user_email, "status": "online"},
+                    to="/",  # Broadcast to all connections
+                )
             app.logger.info(f"User {user_email} logged in")
 
+    def session_identity(user_email):
+        """
+        Resolve the user that owns this socket, binding it on first use.
+        Returns None when the payload email belongs to someone else, so a
+        socket cannot read or send as another user.
+        """
+        user_id = conversation_members.session_user(request.sid)
+        if not user_id:
+            # Client joined without logging in first
+            user_id = conversation_members.bind_session(request.sid, user_email)
+        if not user_id:
+            app.logger.warning(f"User not found: {user_email}")
+            return None
+
+        user = user_summaries.get(user_id)
+        if not user or user.get("email") != user_email:
+            app.logger.warning(
+                f"Socket {request.sid} is bound to another user than {user_email}"
+            )
+            return None
+        return user_id
+
     @socketio.on("join_conversation")
     def handle_join_conversation(data):
         conversation_id = data.get("conversation_id")
@@ -189,19 +244,17 @@ def create_app(config_name=None):
         # Create a room name using conversation ID
         room = f"conversation_{conversation_id}"
 
-        # Verify user is part of the conversation
-        user = User.find_by_email(user_email)
-        if not user:
-            app.logger.warning(f"User not found: {user_email}")
+        # Verify user is part of the conversation, from cache when possible
+        user_id = session_identity(user_email)
+        if not user_id:
             return
 
-        conversation = Conversation.get_by_id(conversation_id)
-        if not conversation:
+        if conversation_members.participants(conversation_id) is None:
             app.logger.warning(f"Conversation not found: {conversation_id}")
             return
 
         # Check if user is a participant
-        if str(user["_id"]) not in conversation["participants"]:
+        if not conversation_members.is_member(conversation_id, user_id):
             app.logger.warning(
                 f"User {user_email} is not a participant in conversation {conversation_id}"
             )
@@ -212,14 +265,14 @@ def create_app(config_name=None):
         app.logger.info(f"User {user_email} joined conversation {conversation_id}")
 
         # Mark conversation as read
-        Conversation.mark_as_read(conversation_id, user_email)
+        Conversation.mark_as_read_by_id(conversation_id, user_id)
 
         # Notify others that messages were read
         socketio.emit(
             "messages_read",
             {
                 "conversation_id": conversation_id,
-                "user_id": str(user["_id"]),
+                "user_id": user_id,
                 "user_email": user_email,
             },
             room=room,
@@ -245,9 +298,15 @@ def create_app(config_name=None):
             app.logger.warning("Incomplete message data")
             return
 
+        user_id = session_identity(user_email)
+        if not user_id:
+            return
+
         try:
-            # Create the message
-            message = Message.create(user_email, conversation_id, text, attachments)
+            # Buffer the message; it is written with the rest of the burst
+            message = message_ingestor.submit(
+                user_email, conversation_id, text, attachments, user_id=user_id
+            )
 
             # Send to all clients in the conversation room
             room = f"conversation_{conversation_id}"
@@ -0,0 +1,76 @@
+import csv
+import io
+import os
+import tempfile
+from openpyxl import Workbook
+
+# Rows buffered before a CSV chunk is sent
+CSV_ROWS_PER_CHUNK = 500
+# Bytes per chunk when streaming a finished XLSX file
+XLSX_CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def stream_csv(header, rows):
+    """
+    Encode rows as CSV, yielding a chunk every CSV_ROWS_PER_CHUNK rows.
+
+    Args:
+        header: Column names
+        rows: Iterable of row value lists
+
+    Yields:
+        str: CSV text
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(["" if value is None else value for value in row])
+        if count % CSV_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+def stream_xlsx(header, rows, sheet_title="Export"):
+    """
+    Write rows to a write-only workbook on disk, then yield the file in
+    XLSX_CHUNK_SIZE chunks.
+
+    XLSX is a zip archive, so nothing can be sent before the last row is
+    written; write-only mode keeps memory flat while the rows are added.
+
+    Args:
+        header: Column names
+        rows: Iterable of row value lists
+        sheet_title: Worksheet name
+
+    Yields:
+        bytes: XLSX file content
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(XLSX_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
@@ -0,0 +1,212 @@
+from app.models.base import (
+    users_collection,
+    feeds_collection,
+    messages_collection,
+    projects_collection,
+    metrics_daily_collection,
+)
+from bson import ObjectId
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from app.utils.cache import TTLCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    "metrics_daily": [
+        IndexModel([("date", ASCENDING)], name="date_1"),
+    ],
+}
+
+METRIC_EVENTS = ["signup", "login", "post", "message", "project"]
+
+# Users already marked active today, so activity costs one write per day
+_active_today = TTLCache(maxsize=50000, ttl=3600)
+
+
+def _day(at=None):
+    """Return the UTC day bucket ID and its midnight for a timestamp."""
+    at = at or datetime.utcnow()
+    midnight = datetime(at.year, at.month, at.day)
+    return midnight.strftime("%Y-%m-%d"), midnight
+
+
+class DailyMetrics:
+    """
+    Per-day counters in metrics_daily, one document per UTC day:
+
+        {"_id": "2024-05-01", "date": <midnight>,
+         "counts": {"signup": 3, "login": 40, ..., "active_users": 25}}
+    """
+
+    @staticmethod
+    def record(event, user_id=None, user_email=None, count=1, at=None):
+        """
+        Count an event in its day bucket and mark the user active.
+
+        Never raises; metrics must not break the request that triggered them.
+
+        Args:
+            event: One of METRIC_EVENTS
+            user_id: ID of the acting user (optional)
+            user_email: Email of the acting user, if the ID is not at hand
+            count: Number of events
+            at: Event time (defaults to now)
+        """
+        try:
+            day_id, midnight = _day(at)
+            metrics_daily_collection.update_one(
+                {"_id": day_id},
+                {"$inc": {f"counts.{event}": count}, "$set": {"date": midnight}},
+                upsert=True,
+            )
+
+        except Exception as e:
+            logger.warning(f"Error recording {event} metric: {e}")
+
+        if user_id or user_email:
+            DailyMetrics.mark_active(user_id=user_id, user_email=user_email, at=at)
+
+    @staticmethod
+    def mark_active(user_id=None, user_email=None, at=None):
+        """
+        Set users.last_active_at at most once per user per day, counting the
+        user in that day's active_users the first time. Never raises.
+
+        Args:
+            user_id: User ID
+            user_email: User email, if the ID is not at hand
+            at: Activity time (defaults to now)
+        """
+        at = at or datetime.utcnow()
+        day_id, midnight = _day(at)
+        key = str(user_id or user_email)
+
+        if _active_today.get(key) == day_id:
+            return
+
+        try:
+            if user_id:
+                query = {"_id": ObjectId(user_id)}
+            else:
+                query = {"email": user_email}
+            query["last_active_at"] = {"$not": {"$gte": midnight}}
+
+            result = users_collection.update_one(
+                query, {"$set": {"last_active_at": at}}
+            )
+            if result.modified_count:
+                metrics_daily_collection.update_one(
+                    {"_id": day_id},
+                    {"$inc": {"counts.active_users": 1}, "$set": {"date": midnight}},
+                    upsert=True,
+                )
+
+            _active_today.set(key, day_id)
+
+        except Exception as e:
+            logger.warning(f"Error marking user active: {e}")
+
+    @staticmethod
+    def get_range(days=30):
+        """
+        Get the day buckets for the past days, oldest first. Days without
+        any recorded event are omitted.
+
+        Args:
+            days: Number of days to look back
+
+        Returns:
+            list: Day buckets with date and counts
+        """
+        try:
+            _, today = _day()
+            cutoff = today - timedelta(days=days)
+
+            buckets = metrics_daily_collection.find(
+                {"date": {"$gte": cutoff}}, {"counts": 1}
+            ).sort("_id", 1)
+
+            return [
+                {"date": bucket["_id"], "counts": bucket.get("counts", {})}
+                for bucket in buckets
+            ]
+
+        except Exception as e:
+            logger.error(f"Error getting daily metrics: {e}")
+            return []
+
+    @staticmethod
+    def count_active_users(days=30):
+        """
+        Count distinct users active in the past days.
+
+        Args:
+            days: Number of days to look back
+
+        Returns:
+            int: Count of active users
+        """
+        try:
+            _, today = _day()
+            cutoff = today - timedelta(days=days)
+            return users_collection.count_documents(
+                {"last_active_at": {"$gte": cutoff}}
+            )
+
+        except Exception as e:
+            logger.error(f"Error counting active users: {e}")
+            return 0
+
+    @staticmethod
+    def backfill():
+        """
+        Rebuild the signup, post, message and project counters from the
+        timestamps already stored on those documents. Idempotent: counts
+        are set, not incremented. Logins and activity were never recorded
+        before, so they cannot be backfilled.
+
+        Returns:
+            int: Number of day counters written
+        """
+        sources = [
+            ("signup", users_collection, "created_at"),
+            ("post", feeds_collection, "timestamp"),
+            ("message", messages_collection, "created_at"),
+            ("project", projects_collection, "created_at"),
+        ]
+
+        written = 0
+        for event, collection, field in sources:
+            pipeline = [
+                {"$match": {field: {"$type": "date"}}},
+                {
+                    "$group": {
+                        "_id": {
+                            "$dateToString": {"format": "%Y-%m-%d", "date": f"${field}"}
+                        },
+                        "count": {"$sum": 1},
+                    }
+                },
+            ]
+
+            operations = [
+                UpdateOne(
+                    {"_id": row["_id"]},
+                    {
+                        "$set": {
+                            f"counts.{event}": row["count"],
+                            "date": datetime.strptime(row["_id"], "%Y-%m-%d"),
+                        }
+                    },
+                    upsert=True,
+                )
+                for row in collection.aggregate(pipeline)
+            ]
+
+            if operations:
+                metrics_daily_collection.bulk_write(operations, ordered=False)
+                written += len(operations)
+
+        return written
@@ -3,286 +3,294 @@ from app.models.base import (
     mentorship_requests,
     projects_collection,
     news_events_collection,
+    analytics_snapshots_collection,
 )
 from bson import ObjectId
 from datetime import datetime, timedelta
 from pymongo import DESCENDING
+from app.analytics.metrics import DailyMetrics
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Seconds a dashboard snapshot is served before being recomputed
+ANALYTICS_SNAPSHOT_MAX_AGE = 300
+DASHBOARD_SNAPSHOT_ID = "dashboard"
+
+# Columns of the user directory export, in order
+USER_EXPORT_FIELDS = [
+    "_id",
+    "name",
+    "email",
+    "role",
+    "dept",
+    "batch",
+    "regno",
+    "staff_id",
+    "created_at",
+]
+USER_EXPORT_BATCH_SIZE = 1000
+
+
+def _user_filter(role=None, dept=None, batch=None, regno=None, created_at=None):
+    """Build the users query shared by the directory listing and export."""
+    query = {}
+
+    if role:
+        query["role"] = role
+    if dept:
+        query["dept"] = dept
+    if batch:
+        query["batch"] = batch
+    if regno:
+        query["regno"] = regno
+    if created_at:
+        query["created_at"] = {"$gte": datetime.fromisoformat(created_at)}
+
+    return query
+
+
+def _count_facet(facet):
+    """Read the count out of a {"$count": "count"} facet result."""
+    return facet[0]["count"] if facet else 0
+
+
+def _distribution_facet(role, field, sort):
+    """Facet stages grouping users of a role by field."""
+    return [
+        {"$match": {"role": role}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": sort},
+    ]
 
-class Analytics:
-    @staticmethod
-    def get_user_counts_by_role():
-        """
-        Get count of users by role.
-
-        Returns:
-            dict: Count of users by role
-        """
-        try:
-            counts = {}
-
-            for role in ["student", "alumni", "staff"]:
-                counts[role] = users_collection.count_documents({"role": role})
-
-            return counts
-
-        except Exception as e:
-            logger.error(f"Error getting user counts: {e}")
-            return {"student": 0, "alumni": 0, "staff": 0}
 
+class Analytics:
     @staticmethod
-    def get_new_user_registrations(days=30):
+    def get_user_metrics(days=30):
         """
-        Get new user registrations for the past days.
+        Get every users-collection dashboard metric in one $facet pipeline,
+        with registrations and activity read from the daily metric buckets.
 
         Args:
-            days: Number of days to look back
+            days: Number of days to look back for registrations and activity
 
         Returns:
-            list: List of registrations by date
-        """
-        try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-
-            pipeline = [
-                {"$match": {"created_at": {"$gte": cutoff_date}}},
-                {
-                    "$group": {
-                        "_id": {
-                            "$dateToString": {
-                                "format": "%Y-%m-%d",
-                                "date": "$created_at",
-                            }
-                        },
-                        "count": {"$sum": 1},
-                    }
-                },
-                {"$sort": {"_id": 1}},
-            ]
-
-            return list(users_collection.aggregate(pipeline))
-
-        except Exception as e:
-            logger.error(f"Error getting new user registrations: {e}")
-            return []
-
-    @staticmethod
-    def get_active_users(days=30):
+            dict: user_counts, new_registrations, active_users,
+                  daily_activity and the department and batch
+                  distributions per role
         """
-        Get count of active users.
-
-        Args:
-            days: Number of days to look back
+        pipeline = [
+            {
+                "$facet": {
+                    "roles": [{"$group": {"_id": "$role", "count": {"$sum": 1}}}],
+                    "student_departments": _distribution_facet(
+                        "student", "dept", {"count": -1}
+                    ),
+                    "alumni_departments": _distribution_facet(
+                        "alumni", "dept", {"count": -1}
+                    ),
+                    "student_batches": _distribution_facet(
+                        "student", "batch", {"_id": 1}
+                    ),
+                    "alumni_batches": _distribution_facet(
+                        "alumni", "batch", {"_id": 1}
+                    ),
+                }
+            }
+        ]
 
-        Returns:
-            int: Count of active users
-        """
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
+            result = next(users_collection.aggregate(pipeline))
 
-            return users_collection.count_documents(
-                {"created_at": {"$gte": cutoff_date}}
-            )
-
-        except Exception as e:
-            logger.error(f"Error getting active users: {e}")
-            return 0
-
-    @staticmethod
-    def get_department_distribution(role):
-        """
-        Get distribution of users by department for a specific role.
-
-        Args:
-            role: User role
+            roles = {row["_id"]: row["count"] for row in result.pop("roles")}
+            result["user_counts"] = {
+                role: roles.get(role, 0) for role in ["student", "alumni", "staff"]
+            }
 
-        Returns:
-            list: List of departments with counts
-        """
-        try:
-            pipeline = [
-                {"$match": {"role": role}},
-                {"$group": {"_id": "$dept", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
+            daily = DailyMetrics.get_range(days)
+            result["new_registrations"] = [
+                {"_id": bucket["date"], "count": bucket["counts"]["signup"]}
+                for bucket in daily
+                if bucket["counts"].get("signup")
             ]
+            result["daily_activity"] = daily
+            result["active_users"] = DailyMetrics.count_active_users(days)
 
-            return list(users_collection.aggregate(pipeline))
+            return result
 
         except Exception as e:
-            logger.error(f"Error getting department distribution: {e}")
-            return []
+            logger.error(f"Error getting user metrics: {e}")
+            return {
+                "user_counts": {"student": 0, "alumni": 0, "staff": 0},
+                "new_registrations": [],
+                "active_users": 0,
+                "daily_activity": [],
+                "student_departments": [],
+                "alumni_departments": [],
+                "student_batches": [],
+                "alumni_batches": [],
+            }
 
     @staticmethod
-    def get_batch_year_distribution(role):
+    def get_project_metrics(top_technologies=10):
         """
-        Get distribution of users by batch year for a specific role.
+        Get project totals, status breakdown and top technologies in one
+        $facet pipeline.
 
         Args:
-            role: User role
+            top_technologies: Maximum number of technologies to return
 
         Returns:
-            list: List of batch years with counts
+            dict: total_projects, project_status_breakdown, top_technologies
         """
-        try:
-            pipeline = [
-                {"$match": {"role": role}},
-                {"$group": {"_id": "$batch", "count": {"$sum": 1}}},
-                {"$sort": {"_id": 1}},
-            ]
-
-            return list(users_collection.aggregate(pipeline))
-
-        except Exception as e:
-            logger.error(f"Error getting batch year distribution: {e}")
-            return []
-
-    @staticmethod
-    def get_mentorship_request_status_breakdown():
-        """
-        Get breakdown of mentorship requests by status.
+        pipeline = [
+            {
+                "$facet": {
+                    "total": [{"$count": "count"}],
+                    "status": [
+                        {
+                            "$group": {
+                                "_id": {
+                                    "$switch": {
+                                        "branches": [
+                                            {
+                                                "case": {"$eq": ["$progress", 0]},
+                                                "then": "Not Started",
+                                            },
+                                            {
+                                                "case": {"$lt": ["$progress", 100]},
+                                                "then": "In Progress",
+                                            },
+                                            {
+                                                "case": {"$eq": ["$progress", 100]},
+                                                "then": "Completed",
+                                            },
+                                        ],
+                                        "default": "Unknown",
+                                    }
+                                },
+                                "count": {"$sum": 1},
+                            }
+                        },
+                        {"$project": {"status": "$_id", "count": 1, "_id": 0}},
+                    ],
+                    "technologies": [
+                        {"$unwind": "$tech_stack"},
+                        {"$group": {"_id": "$tech_stack", "count": {"$sum": 1}}},
+                        {"$sort": {"count": -1}},
+                        {"$limit": top_technologies},
+                        {"$project": {"tech": "$_id", "count": 1, "_id": 0}},
+                    ],
+                }
+            }
+        ]
 
-        Returns:
-            list: List of statuses with counts
-        """
         try:
-            pipeline = [
-                {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-                {"$project": {"status": "$_id", "count": 1, "_id": 0}},
-            ]
+            result = next(projects_collection.aggregate(pipeline))
 
-            return list(mentorship_requests.aggregate(pipeline))
+            return {
+                "total_projects": _count_facet(result["total"]),
+                "project_status_breakdown": result["status"],
+                "top_technologies": result["technologies"],
+            }
 
         except Exception as e:
-            logger.error(f"Error getting mentorship request status breakdown: {e}")
-            return []
+            logger.error(f"Error getting project metrics: {e}")
+            return {
+                "total_projects": 0,
+                "project_status_breakdown": [],
+                "top_technologies": [],
+            }
 
     @staticmethod
-    def get_total_mentorship_requests(days=None):
+    def get_mentorship_metrics():
         """
-        Get total count of mentorship requests.
-
-        Args:
-            days: Number of days to look back (optional)
+        Get mentorship request totals and status breakdown in one pipeline.
 
         Returns:
-            int: Count of mentorship requests
+            dict: total_requests, request_status_breakdown
         """
-        try:
-            query = {}
-
-            if days:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                query = {"created_at": {"$gte": cutoff_date}}
-
-            pipeline = [
-                {"$match": query},
-                {"$group": {"_id": None, "count": {"$sum": 1}}},
-                {"$project": {"_id": 0, "count": 1}},
-            ]
+        pipeline = [
+            {
+                "$facet": {
+                    "total": [{"$count": "count"}],
+                    "status": [
+                        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+                        {"$project": {"status": "$_id", "count": 1, "_id": 0}},
+                    ],
+                }
+            }
+        ]
 
-            result = list(mentorship_requests.aggregate(pipeline))
+        try:
+            result = next(mentorship_requests.aggregate(pipeline))
 
-            return result[0]["count"] if result else 0
+            return {
+                "total_requests": _count_facet(result["total"]),
+                "request_status_breakdown": result["status"],
+            }
 
         except Exception as e:
-            logger.error(f"Error getting total mentorship requests: {e}")
-            return 0
+            logger.error(f"Error getting mentorship metrics: {e}")
+            return {"total_requests": 0, "request_status_breakdown": []}
 
     @staticmethod
-    def get_total_projects_created(days=None):
+    def compute_dashboard():
         """
-        Get total count of projects created.
-
-        Args:
-            days: Number of days to look back (optional)
+        Compute the staff dashboard with one aggregation per collection.
 
         Returns:
-            int: Count of projects
+            dict: Dashboard metrics
         """
-        try:
-            query = {}
-
-            if days:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                query = {"created_at": {"$gte": cutoff_date}}
-
-            return projects_collection.count_documents(query)
-
-        except Exception as e:
-            logger.error(f"Error getting total projects created: {e}")
-            return 0
+        dashboard = {}
+        dashboard.update(Analytics.get_user_metrics())
+        dashboard.update(Analytics.get_mentorship_metrics())
+        dashboard.update(Analytics.get_project_metrics())
+        return dashboard
 
     @staticmethod
-    def get_project_status_breakdown():
+    def refresh_dashboard_snapshot():
         """
-        Get breakdown of projects by status.
+        Recompute the dashboard and store it as the current snapshot.
 
         Returns:
-            list: List of statuses with counts
+            dict: Snapshot with data and generated_at
         """
-        try:
-            pipeline = [
-                {
-                    "$project": {
-                        "status": {
-                            "$switch": {
-                                "branches": [
-                                    {
-                                        "case": {"$eq": ["$progress", 0]},
-                                        "then": "Not Started",
-                                    },
-                                    {
-                                        "case": {"$lt": ["$progress", 100]},
-                                        "then": "In Progress",
-                                    },
-                                    {
-                                        "case": {"$eq": ["$progress", 100]},
-                                        "then": "Completed",
-                                    },
-                                ],
-                                "default": "Unknown",
-                            }
-                        }
-                    }
-                },
-                {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-                {"$project": {"status": "$_id", "count": 1, "_id": 0}},
-            ]
-
-            return list(projects_collection.aggregate(pipeline))
-
-        except Exception as e:
-            logger.error(f"Error getting project status breakdown: {e}")
-            return []
+        snapshot = {
+            "data": Analytics.compute_dashboard(),
+            "generated_at": datetime.utcnow(),
+        }
+        analytics_snapshots_collection.replace_one(
+            {"_id": DASHBOARD_SNAPSHOT_ID}, snapshot, upsert=True
+        )
+        return snapshot
 
     @staticmethod
-    def get_top_technologies(limit=10):
+    def get_dashboard(max_age=ANALYTICS_SNAPSHOT_MAX_AGE, refresh=False):
         """
-        Get top technologies used in projects.
+        Get the dashboard from its snapshot, recomputing it when missing,
+        older than max_age or when refresh is requested.
 
         Args:
-            limit: Maximum number of technologies to return
+            max_age: Maximum snapshot age in seconds
+            refresh: Always recompute
 
         Returns:
-            list: List of technologies with counts
+            dict: Dashboard metrics plus generated_at
         """
-        try:
-            pipeline = [
-                {"$unwind": "$tech_stack"},
-                {"$group": {"_id": "$tech_stack", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": limit},
-                {"$project": {"tech": "$_id", "count": 1, "_id": 0}},
-            ]
+        snapshot = None
+        if not refresh:
+            snapshot = analytics_snapshots_collection.find_one(
+                {"_id": DASHBOARD_SNAPSHOT_ID}
+            )
 
-            return list(projects_collection.aggregate(pipeline))
+        stale_before = datetime.utcnow() - timedelta(seconds=max_age)
+        if not snapshot or snapshot["generated_at"] < stale_before:
+            snapshot = Analytics.refresh_dashboard_snapshot()
 
-        except Exception as e:
-            logger.error(f"Error getting top technologies: {e}")
-            return []
+        dashboard = dict(snapshot["data"])
+        dashboard["generated_at"] = snapshot["generated_at"].isoformat()
+        return dashboard
 
     @staticmethod
     def get_all_users(
@@ -310,19 +318,7 @@ class Analytics:
             dict: Dictionary with users, total count, and pagination info
         """
         try:
-            # Build query
-            query = {}
-
-            if role:
-                query["role"] = role
-            if dept:
-                query["dept"] = dept
-            if batch:
-                query["batch"] = batch
-            if regno:
-                query["regno"] = regno
-            if created_at:
-                query["created_at"] = {"$gte": datetime.fromisoformat(created_at)}
+            query = _user_filter(role, dept, batch, regno, created_at)
 
             # Calculate skip
             skip = (page - 1) * per_page
@@ -360,6 +356,48 @@ class Analytics:
                 "current_page": page,
             }
 
+    @staticmethod
+    def iter_user_rows(role=None, dept=None, batch=None, regno=None, created_at=None):
+        """
+        Yield the filtered user directory one row at a time, for exports.
+
+        Reads a projected cursor in _id order in batches of
+        USER_EXPORT_BATCH_SIZE, so memory stays flat however many users
+        match.
+
+        Args:
+            role: Filter by role
+            dept: Filter by department
+            batch: Filter by batch
+            regno: Filter by registration number
+            created_at: Filter by creation date
+
+        Yields:
+            list: Values in USER_EXPORT_FIELDS order
+        """
+        query = _user_filter(role, dept, batch, regno, created_at)
+        projection = {field: 1 for field in USER_EXPORT_FIELDS}
+
+        cursor = (
+            users_collection.find(query, projection)
+            .sort("_id", 1)
+            .batch_size(USER_EXPORT_BATCH_SIZE)
+        )
+
+        try:
+            for user in cursor:
+                row = []
+                for field in USER_EXPORT_FIELDS:
+                    value = user.get(field)
+                    if isinstance(value, ObjectId):
+                        value = str(value)
+                    elif isinstance(value, datetime):
+                        value = value.isoformat()
+                    row.append(value)
+                yield row
+        finally:
+            cursor.close()
+
     @staticmethod
     def get_alumni_by_willingness(willingness_filter=""):
         """
@@ -1,6 +1,21 @@
-from flask import Blueprint, request, jsonify, current_app
+import click
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    current_app,
+    stream_with_context,
+)
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.analytics.models import Analytics
+from app.analytics.models import (
+    Analytics,
+    ANALYTICS_SNAPSHOT_MAX_AGE,
+    USER_EXPORT_FIELDS,
+)
+from app.analytics.metrics import DailyMetrics
+from app.analytics.export import EXPORT_FORMATS, stream_csv, stream_xlsx
+from datetime import datetime
 from app.auth.models import User
 from app.mentorship.models import MentorshipRequest
 
@@ -18,21 +33,13 @@ def get_analytics():
         if not user or user["role"].lower() not in ["staff", "admin"]:
             return jsonify({"message": "Unauthorized"}), 403
 
-        # Aggregate analytics data
-        analytics_data = {
-            "user_counts": Analytics.get_user_counts_by_role(),
-            "new_registrations": Analytics.get_new_user_registrations(),
-            "active_users": Analytics.get_active_users(),
-            "student_departments": Analytics.get_department_distribution("student"),
-            "alumni_departments": Analytics.get_department_distribution("alumni"),
-            "student_batches": Analytics.get_batch_year_distribution("student"),
-            "alumni_batches": Analytics.get_batch_year_distribution("alumni"),
-            "request_status_breakdown": Analytics.get_mentorship_request_status_breakdown(),
-            "total_requests": Analytics.get_total_mentorship_requests(),
-            "total_projects": Analytics.get_total_projects_created(),
-            "project_status_breakdown": Analytics.get_project_status_breakdown(),
-            "top_technologies": Analytics.get_top_technologies(),
-        }
+        # Served from the precomputed snapshot unless it is stale
+        analytics_data = Analytics.get_dashboard(
+            max_age=current_app.config.get(
+                "ANALYTICS_SNAPSHOT_MAX_AGE", ANALYTICS_SNAPSHOT_MAX_AGE
+            ),
+            refresh=request.args.get("refresh", "").lower() in ["true", "1", "yes"],
+        )
 
         return jsonify(analytics_data), 200
 
@@ -73,6 +80,55 @@ def get_users_list():
         return jsonify({"message": "An error occurred while fetching user list"}), 500
 
 
+@analytics_bp.route("/analytics/users/export", methods=["GET"])
+@jwt_required()
+def export_users():
+    try:
+        current_user = get_jwt_identity()
+        user = User.find_by_email(current_user)
+
+        # Authorization check
+        if not user or user["role"].lower() not in ["staff", "admin"]:
+            return jsonify({"message": "Unauthorized"}), 403
+
+        export_format = request.args.get("format", "csv").lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({"message": "Format must be csv or xlsx"}), 400
+
+        # Validate before streaming; errors cannot be reported once it starts
+        created_at = request.args.get("created_at")
+        if created_at:
+            try:
+                datetime.fromisoformat(created_at)
+            except ValueError:
+                return jsonify({"message": "Invalid created_at date"}), 400
+
+        rows = Analytics.iter_user_rows(
+            role=request.args.get("role"),
+            dept=request.args.get("dept"),
+            batch=request.args.get("batch"),
+            regno=request.args.get("regno"),
+            created_at=created_at,
+        )
+
+        if export_format == "csv":
+            body = stream_csv(USER_EXPORT_FIELDS, rows)
+        else:
+            body = stream_xlsx(USER_EXPORT_FIELDS, rows, sheet_title="Users")
+
+        # No Content-Length, so the response goes out chunked
+        filename = f"users-{datetime.utcnow():%Y%m%d}.{export_format}"
+        return Response(
+            stream_with_context(body),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
+    except Exception as e:
+        current_app.logger.error(f"Error in export_users route: {str(e)}")
+        return jsonify({"message": "An error occurred while exporting users"}), 500
+
+
 @analytics_bp.route("/alumni/willingness", methods=["GET", "OPTIONS"])
 @jwt_required()
 def get_alumni_willingness():
@@ -155,3 +211,19 @@ def get_alumni_posts(alumnus_id):
     except Exception as e:
         current_app.logger.error(f"Error in /alumni/<alumnus_id>/posts: {str(e)}")
         return jsonify({"message": "An error occurred while fetching posts."}), 500
+
+
+@analytics_bp.cli.command("refresh-snapshot")
+def refresh_snapshot():
+    """Recompute the staff dashboard snapshot (run on a schedule)."""
+    snapshot = Analytics.refresh_dashboard_snapshot()
+    click.echo(
+        f"Dashboard snapshot generated at {snapshot['generated_at'].isoformat()}"
+    )
+
+
+@analytics_bp.cli.command("backfill-metrics")
+def backfill_metrics():
+    """Rebuild the daily signup, post, message and project counters."""
+    written = DailyMetrics.backfill()
+    click.echo(f"Wrote {written} daily metric counters")
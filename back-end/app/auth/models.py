@@ -1,11 +1,58 @@
 from bson import ObjectId
 from datetime import datetime
 from app.models.base import users_collection
+from pymongo import ASCENDING, IndexModel
+from app.utils.cache import user_summaries
+from app.analytics.metrics import DailyMetrics
 from app.utils.security import generate_password_hash, check_password_hash
+from app.utils.search import (
+    SEARCH_KEYS_VERSION,
+    build_search_keys,
+    rank_expression,
+    rank_match,
+    search_key_clauses,
+)
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+USER_SEARCH_LIMIT = 10
+USER_SEARCH_LIMIT_MAX = 25
+# Candidates fetched from the index before ranking
+USER_SEARCH_CANDIDATES = 100
+
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+        IndexModel([("regno", ASCENDING)], name="regno_1", sparse=True),
+        IndexModel([("role", ASCENDING), ("dept", ASCENDING)], name="role_1_dept_1"),
+        IndexModel([("search_keys", ASCENDING)], name="search_keys_1"),
+        # Finds users whose search keys predate SEARCH_KEYS_VERSION
+        IndexModel([("search_keys_version", ASCENDING)], name="search_keys_version_1"),
+        IndexModel([("last_active_at", ASCENDING)], name="last_active_at_1"),
+        # Mentors by role and willingness
+        IndexModel(
+            [("role", ASCENDING), ("willingness", ASCENDING)],
+            name="role_1_willingness_1",
+        ),
+    ],
+    "student_records": [
+        IndexModel([("regno", ASCENDING)], name="regno_1", unique=True),
+        # Covers the fallback verification query when the index is not loaded
+        IndexModel(
+            [
+                ("regno", ASCENDING),
+                ("dept", ASCENDING),
+                ("is_alumni", ASCENDING),
+                ("name", ASCENDING),
+                ("batch", ASCENDING),
+            ],
+            name="regno_1_dept_1_is_alumni_1_name_1_batch_1",
+        ),
+    ],
+}
+
 
 class User:
     @staticmethod
@@ -53,6 +100,8 @@ class User:
                 "dept": data.get("dept"),
                 "created_at": datetime.utcnow(),
                 "willingness": data.get("willingness", []),
+                "search_keys": build_search_keys(data.get("name"), data.get("email")),
+                "search_keys_version": SEARCH_KEYS_VERSION,
             }
 
             # Add role-specific fields
@@ -64,6 +113,7 @@ class User:
 
             # Insert the user
             result = users_collection.insert_one(user_data)
+            DailyMetrics.record("signup", user_id=result.inserted_id)
             return str(result.inserted_id)
 
         except Exception as e:
@@ -93,8 +143,13 @@ class User:
                 k: v for k, v in data.items() if k not in ["email", "password", "role"]
             }
 
+            if "name" in safe_data:
+                safe_data["search_keys"] = build_search_keys(safe_data["name"], email)
+                safe_data["search_keys_version"] = SEARCH_KEYS_VERSION
+
             if safe_data:
                 users_collection.update_one({"email": email}, {"$set": safe_data})
+                user_summaries.invalidate(email=email)
             return True
         except Exception as e:
             logger.error(f"Error updating user profile: {str(e)}")
@@ -115,75 +170,133 @@ class User:
         Returns:
             bool: True if record exists, False otherwise
         """
-        from app.models.base import student_records_collection
+        from app.auth.student_index import student_records_index
 
-        # Build query
-        query = {"regno": regno, "dept": dept, "is_alumni": is_alumni}
-        if name:
-            query["name"] = name
-        if batch:
-            query["batch"] = int(batch)
-
-        # Check if record exists
-        return student_records_collection.find_one(query) is not None
+        return student_records_index.verify(regno, dept, name, batch, is_alumni)
 
     @staticmethod
-    def search_users(query="", role="", dept="", current_user_email=None):
+    def search_users(
+        query="", role="", dept="", current_user_email=None, limit=USER_SEARCH_LIMIT
+    ):
         """
-        Search for users.
+        Typeahead search for users by name or email.
+
+        Matches go through the search_keys prefix/n-gram index. Users whose
+        keys are missing or predate SEARCH_KEYS_VERSION are matched with the
+        old regex until backfill-search-keys has run. Every match is scored
+        in the database before the candidate list is cut, then ranked:
+        exact name, name prefix, name word prefix, email prefix, then
+        infix matches.
 
         Args:
             query: Search term for name or email
             role: Filter by role
             dept: Filter by department
             current_user_email: Email of current user to exclude from results
+            limit: Maximum number of results (capped at USER_SEARCH_LIMIT_MAX)
 
         Returns:
             list: List of matching users
         """
         try:
-            # Build MongoDB query
-            mongo_query = {}
+            limit = max(1, min(int(limit), USER_SEARCH_LIMIT_MAX))
+            query = (query or "").strip()
+
+            # Every condition must hold, so combine them explicitly
+            conditions = []
 
-            # Add search term if provided
             if query:
-                mongo_query["$or"] = [
-                    {"name": {"$regex": query, "$options": "i"}},
-                    {"email": {"$regex": query, "$options": "i"}},
-                ]
+                pattern = {"$regex": re.escape(query), "$options": "i"}
+                conditions.append(
+                    {
+                        "$or": [
+                            {"$and": search_key_clauses(query)},
+                            {
+                                "search_keys_version": {"$ne": SEARCH_KEYS_VERSION},
+                                "$or": [{"name": pattern}, {"email": pattern}],
+                            },
+                        ]
+                    }
+                )
 
             # Add role filter if provided
             if role:
-                mongo_query["role"] = role
+                conditions.append({"role": role})
 
             # Add department filter if provided
             if dept:
-                mongo_query["dept"] = dept
+                conditions.append({"dept": dept})
 
             # Exclude current user
             if current_user_email:
-                mongo_query["email"] = {"$ne": current_user_email}
+                conditions.append({"email": {"$ne": current_user_email}})
+
+            mongo_query = {"$and": conditions} if conditions else {}
+            projection = {"password": 0, "search_keys": 0, "search_keys_version": 0}
 
-            # Find users
-            users = list(users_collection.find(mongo_query).limit(10))
+            if not query:
+                users = list(
+                    users_collection.find(mongo_query, projection)
+                    .sort("name", ASCENDING)
+                    .limit(limit)
+                )
+            else:
+                candidates = users_collection.aggregate(
+                    [
+                        {"$match": mongo_query},
+                        {"$project": projection},
+                        {"$addFields": {"_rank": rank_expression(query)}},
+                        {"$sort": {"_rank": -1, "name": 1}},
+                        {"$limit": USER_SEARCH_CANDIDATES},
+                        {"$project": {"_rank": 0}},
+                    ]
+                )
+                users = sorted(
+                    candidates,
+                    key=lambda u: (
+                        -rank_match(query, u.get("name"), u.get("email")),
+                        (u.get("name") or "").lower(),
+                    ),
+                )[:limit]
 
-            # Format results
-            result = []
             for user in users:
                 user["_id"] = str(user["_id"])
 
-                # Remove sensitive information
-                if "password" in user:
-                    del user["password"]
-
-                result.append(user)
-
-            return result
+            return users
 
         except Exception as e:
             logger.error(f"Error searching users: {e}")
             return []
 
+    @staticmethod
+    def backfill_search_keys():
+        """
+        Store search_keys on users registered before typeahead indexing or
+        whose keys predate SEARCH_KEYS_VERSION.
+
+        Returns:
+            int: Number of users updated
+        """
+        updated = 0
+        for user in users_collection.find(
+            {"search_keys_version": {"$ne": SEARCH_KEYS_VERSION}},
+            {"name": 1, "email": 1},
+        ):
+            users_collection.update_one(
+                {"_id": user["_id"]},
+                {
+                    "$set": {
+                        "search_keys": build_search_keys(
+                            user.get("name"), user.get("email")
+                        ),
+                        "search_keys_version": SEARCH_KEYS_VERSION,
+                    }
+                },
+            )
+            updated += 1
+
+        return updated
+
     @staticmethod
     def find_by_regno(regno):
         """Find a user by registration number."""
@@ -1,3 +1,4 @@
+import click
 import re
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import (
@@ -7,6 +8,7 @@ from flask_jwt_extended import (
     create_refresh_token,
 )
 from app.auth.models import User
+from app.analytics.metrics import DailyMetrics
 from app.utils.email import send_bug_report_email
 from app.utils.validators import validate_user_input
 from datetime import timedelta
@@ -118,6 +120,8 @@ def login():
         if not User.verify_password(password, user["password"]):
             return jsonify({"message": "Invalid email or password"}), 401
 
+        DailyMetrics.record("login", user_id=user["_id"])
+
         # Create tokens
         access_token = create_access_token(identity=email)
         refresh_token = create_refresh_token(identity=email)
@@ -242,3 +246,10 @@ def submit_bug_report():
     except Exception as e:
         current_app.logger.error(f"Error submitting bug report: {str(e)}")
         return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+@auth_bp.cli.command("backfill-search-keys")
+def backfill_search_keys():
+    """Store typeahead search keys on users that lack them or have stale ones."""
+    updated = User.backfill_search_keys()
+    click.echo(f"Updated {updated} users")
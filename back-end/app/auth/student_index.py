@@ -0,0 +1,168 @@
+import click
+import logging
+import threading
+import time
+from app.models.base import (
+    student_records_collection,
+    student_records_meta_collection,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the registry version written by the importer
+STUDENT_INDEX_REFRESH = 60
+STUDENT_RECORDS_VERSION_ID = "version"
+
+
+def normalize_regno(regno):
+    """Normalize a registration number the way the importer stores it."""
+    return str(regno or "").strip().upper()
+
+
+class StudentRecordIndex:
+    """
+    The student registry held in memory as a dict keyed by normalized
+    regno, so signup verification needs no database round trip.
+
+    The importer bumps a version document after every run; each process
+    checks it at most every refresh_interval seconds and reloads the
+    registry when it changed. If the registry cannot be loaded, checks
+    fall back to querying student_records.
+    """
+
+    def __init__(self, app=None):
+        self.refresh_interval = STUDENT_INDEX_REFRESH
+        self._records = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get(
+            "STUDENT_INDEX_REFRESH", STUDENT_INDEX_REFRESH
+        )
+        # CLI commands rarely verify signups; the first check loads lazily
+        in_cli = click.get_current_context(silent=True) is not None
+        if app.config.get("STUDENT_INDEX_PRELOAD") and not in_cli:
+            self.load()
+
+    def load(self):
+        """
+        Load the registry and remember its version.
+
+        Returns:
+            int: Number of records loaded, or None if loading failed
+        """
+        try:
+            version = self._current_version()
+            records = {}
+            for record in student_records_collection.find(
+                {},
+                {
+                    "_id": 0,
+                    "regno": 1,
+                    "dept": 1,
+                    "name": 1,
+                    "batch": 1,
+                    "is_alumni": 1,
+                },
+            ):
+                records[normalize_regno(record.get("regno"))] = (
+                    record.get("dept"),
+                    record.get("name"),
+                    record.get("batch"),
+                    bool(record.get("is_alumni", False)),
+                )
+        except Exception as e:
+            logger.error(f"Error loading student records index: {e}")
+            return None
+
+        with self._lock:
+            self._records = records
+            self._version = version
+            self._checked_at = time.monotonic()
+
+        logger.info(f"Loaded {len(records)} student records (version {version})")
+        return len(records)
+
+    def verify(self, regno, dept, name=None, batch=None, is_alumni=False):
+        """
+        Check a signup against the registry, with the same matching rules
+        as the student_records query it replaces.
+
+        Args:
+            regno: Registration number
+            dept: Department
+            name: Name (optional)
+            batch: Batch year (optional)
+            is_alumni: Whether checking for alumni status
+
+        Returns:
+            bool: True if record exists, False otherwise
+        """
+        records = self._fresh_records()
+        if records is None:
+            return self._verify_in_db(regno, dept, name, batch, is_alumni)
+
+        record = records.get(normalize_regno(regno))
+        if record is None:
+            return False
+
+        record_dept, record_name, record_batch, record_is_alumni = record
+        if record_dept != dept or record_is_alumni != is_alumni:
+            return False
+        if name and record_name != name:
+            return False
+        if batch and record_batch != int(batch):
+            return False
+        return True
+
+    def _fresh_records(self):
+        """
+        Return the registry, reloading it when its version changed. A
+        failed load is retried after refresh_interval; until then callers
+        get None and query the database.
+        """
+        with self._lock:
+            records = self._records
+            due = time.monotonic() - self._checked_at >= self.refresh_interval
+            if due:
+                # Claim the check so concurrent signups do not repeat it
+                self._checked_at = time.monotonic()
+
+        if due:
+            try:
+                if records is None or self._current_version() != self._version:
+                    self.load()
+            except Exception as e:
+                logger.warning(f"Error checking student records version: {e}")
+
+        with self._lock:
+            return self._records
+
+    @staticmethod
+    def _current_version():
+        meta = student_records_meta_collection.find_one(
+            {"_id": STUDENT_RECORDS_VERSION_ID}
+        )
+        return meta["version"] if meta else None
+
+    @staticmethod
+    def _verify_in_db(regno, dept, name, batch, is_alumni):
+        query = {"regno": normalize_regno(regno), "dept": dept, "is_alumni": is_alumni}
+        if name:
+            query["name"] = name
+        if batch:
+            query["batch"] = int(batch)
+
+        return (
+            student_records_collection.find_one(query, {"_id": 0, "regno": 1})
+            is not None
+        )
+
+
+# Shared instance, configured in create_app
+student_records_index = StudentRecordIndex()
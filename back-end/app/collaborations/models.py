@@ -7,108 +7,260 @@ from app.models.base import (
 )
 from bson import ObjectId
 from datetime import datetime, timezone
+from pymongo import ASCENDING, DESCENDING, IndexModel
 import logging
 
-from app.utils.helpers import mongo_to_json_serializable
+from app.utils.cache import user_summaries
+from app.utils.helpers import (
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    mongo_to_json_serializable,
+)
 
 logger = logging.getLogger(__name__)
 
+# Default and maximum number of projects per explore page
+EXPLORE_PAGE_SIZE = 12
+EXPLORE_PAGE_SIZE_MAX = 50
+
+INDEXES = {
+    "collaboration_requests": [
+        IndexModel(
+            [("project_owner_id", ASCENDING), ("created_at", DESCENDING)],
+            name="project_owner_id_1_created_at_-1",
+        ),
+        IndexModel(
+            [("student_id", ASCENDING), ("created_at", DESCENDING)],
+            name="student_id_1_created_at_-1",
+        ),
+        IndexModel(
+            [("project_id", ASCENDING), ("student_id", ASCENDING)],
+            name="project_id_1_student_id_1",
+        ),
+    ],
+}
+
+
+def _id_variants(user_id):
+    """Match a user ID stored either as an ObjectId or as a string."""
+    if ObjectId.is_valid(user_id):
+        return [ObjectId(user_id), str(user_id)]
+    return [user_id]
+
+
+def _get_projects(project_ids):
+    """
+    Fetch the projects referenced by collaboration requests in one query.
+
+    Args:
+        project_ids: Iterable of project IDs
+
+    Returns:
+        dict: Projects keyed by string ID
+    """
+    ids = {ObjectId(pid) for pid in project_ids if pid and ObjectId.is_valid(pid)}
+    if not ids:
+        return {}
+
+    projects = projects_collection.find(
+        {"_id": {"$in": list(ids)}},
+        {"title": 1, "abstract": 1, "tech_stack": 1, "created_by": 1},
+    )
+    return {str(project["_id"]): project for project in projects}
+
+
+def _isoformat(value):
+    """Format a stored date, tolerating legacy non-datetime values."""
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _format_request(req, project, users):
+    """
+    Format a collaboration request with its project and message thread.
+
+    Args:
+        req: Collaboration request document
+        project: Referenced project document
+        users: User summaries keyed by string ID
+
+    Returns:
+        dict: Serialized request
+    """
+    formatted_req = {
+        "_id": str(req.get("_id")),
+        "status": req.get("status", "pending"),
+        "message": req.get("message", ""),
+        "created_at": _isoformat(req.get("created_at")),
+        "updated_at": _isoformat(req.get("updated_at")),
+        "project": {
+            "_id": str(project.get("_id")),
+            "title": project.get("title", "Untitled"),
+            "abstract": project.get("abstract", ""),
+            "tech_stack": project.get("tech_stack", []),
+        },
+    }
+
+    # Add messages if any
+    if req.get("messages"):
+        formatted_req["messages"] = []
+
+        for msg in req["messages"]:
+            sender_id = msg.get("sender_id")
+            sender = users.get(str(sender_id))
+
+            formatted_req["messages"].append(
+                {
+                    "sender_id": str(sender_id),
+                    "sender_name": (
+                        sender.get("name", "Unknown") if sender else "Unknown"
+                    ),
+                    "content": msg.get("content", ""),
+                    "sent_at": _isoformat(msg.get("sent_at")),
+                }
+            )
+
+    return formatted_req
+
+
+def _explore_facets(dept_filter, tech_filter):
+    """Facet pipelines for the total and department/technology counts."""
+    return {
+        "total": [
+            {"$match": {**dept_filter, **tech_filter}},
+            {"$count": "count"},
+        ],
+        "departments": [
+            {"$match": tech_filter},
+            {"$group": {"_id": "$creator_dept", "count": {"$sum": 1}}},
+            {"$match": {"_id": {"$ne": None}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$project": {"_id": 0, "dept": "$_id", "count": 1}},
+        ],
+        "technologies": [
+            {"$match": dept_filter},
+            {
+                "$project": {
+                    "tech": {
+                        "$setUnion": [
+                            {"$ifNull": ["$techStack", []]},
+                            {"$ifNull": ["$tech_stack", []]},
+                        ]
+                    }
+                }
+            },
+            {"$unwind": "$tech"},
+            {"$group": {"_id": "$tech", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$project": {"_id": 0, "tech": "$_id", "count": 1}},
+        ],
+    }
+
 
 class Collaboration:
     @staticmethod
-    def explore_projects(user_id, dept=None, tech=None):
+    def explore_projects(
+        user_id, dept=None, tech=None, cursor=None, limit=EXPLORE_PAGE_SIZE
+    ):
         """
         Get projects available for collaboration.
-        """
-        try:
-            logger.info(
-                f"Explore projects called with user_id: {user_id}, dept: {dept}, tech: {tech}"
-            )
-
-            # Convert user_id to ObjectId if it's a string
-            if isinstance(user_id, str) and len(user_id) == 24:
-                try:
-                    user_id_obj = ObjectId(user_id)
-                    logger.info(f"Converted user_id to ObjectId: {user_id_obj}")
-                except:
-                    user_id_obj = user_id
-                    logger.info(
-                        f"Failed to convert user_id to ObjectId, using as is: {user_id}"
-                    )
-            else:
-                user_id_obj = user_id
-                logger.info(f"User ID not converted: {user_id_obj}")
 
-            # Simple query that should return results - find all projects
-            all_projects = list(projects_collection.find())
-            logger.info(f"Total projects in database: {len(all_projects)}")
+        The page is read with an indexed find sorted on (created_at, _id).
+        Total and facet counts are computed by a separate aggregation on
+        the first page only. Each facet ignores its own filter, so the
+        department list stays complete while a department is selected
+        (and likewise for technologies).
 
-            # Now filter out user's own projects
-            filtered_projects = []
-            for project in all_projects:
-                project_creator_id = project.get("created_by")
+        Args:
+            user_id: ID of the current user (their projects are excluded)
+            dept: Filter by the creator's department (optional)
+            tech: Filter by technology in the tech stack (optional)
+            cursor: Cursor returned as next_cursor by the previous page
+            limit: Number of projects per page (capped at EXPLORE_PAGE_SIZE_MAX)
 
-                # Skip projects created by the current user
-                should_skip = False
+        Returns:
+            dict: Projects, next_cursor, total matches and facet counts
+                  (facets are only computed for the first page)
 
-                # Convert both IDs to strings for comparison
-                if isinstance(project_creator_id, ObjectId):
-                    project_creator_str = str(project_creator_id)
-                else:
-                    project_creator_str = str(project_creator_id)
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(int(limit), EXPLORE_PAGE_SIZE_MAX))
+
+        not_own = {"created_by": {"$nin": _id_variants(user_id)}}
+        dept_filter = {"creator_dept": dept} if dept else {}
+        tech_filter = (
+            {"$or": [{"techStack": tech}, {"tech_stack": tech}]} if tech else {}
+        )
+
+        page_filter = {**not_own, **dept_filter, **tech_filter}
+        if cursor:
+            page_filter = {
+                "$and": [
+                    page_filter,
+                    keyset_filter("created_at", decode_cursor(cursor)),
+                ]
+            }
 
-                user_id_str = str(user_id)
+        try:
+            projects = list(
+                projects_collection.find(page_filter)
+                .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+                .limit(limit + 1)
+            )
+            has_more = len(projects) > limit
+            projects = projects[:limit]
 
-                logger.info(
-                    f"Comparing project creator {project_creator_str} with user {user_id_str}"
-                )
+            # Get creator details for the page
+            creators = user_summaries.get_many(
+                project.get("created_by") for project in projects
+            )
 
-                if project_creator_str == user_id_str:
-                    should_skip = True
-                    logger.info(
-                        f"Skipping project {project.get('_id')} - created by current user"
-                    )
+            data = []
+            for project in projects:
+                serialized_project = mongo_to_json_serializable(project)
 
-                if not should_skip:
-                    # Full serialization for the project
-                    serialized_project = {}
+                creator = creators.get(str(project.get("created_by")))
+                if creator:
+                    serialized_project["creator"] = {
+                        "name": creator.get("name", "Unknown"),
+                        "dept": creator.get("dept", "Unknown"),
+                        "_id": str(creator["_id"]),
+                    }
 
-                    for key, value in project.items():
-                        if isinstance(value, ObjectId):
-                            serialized_project[key] = str(value)
-                        elif isinstance(value, datetime):
-                            serialized_project[key] = value.isoformat()
-                        elif isinstance(value, list):
-                            serialized_project[key] = [
-                                str(item) if isinstance(item, ObjectId) else item
-                                for item in value
-                            ]
-                        else:
-                            serialized_project[key] = value
+                data.append(serialized_project)
 
-                    # Get creator details
-                    if "created_by" in project:
-                        creator = users_collection.find_one(
-                            {"_id": project["created_by"]}
-                        )
-                        if creator:
-                            serialized_project["creator"] = {
-                                "name": creator.get("name", "Unknown"),
-                                "dept": creator.get("dept", "Unknown"),
-                                "_id": str(creator["_id"]),
-                            }
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_cursor(
+                    projects[-1]["created_at"], projects[-1]["_id"]
+                )
 
-                    filtered_projects.append(serialized_project)
+            response = {"data": data, "next_cursor": next_cursor}
+            if not cursor:
+                result = next(
+                    projects_collection.aggregate(
+                        [
+                            {"$match": not_own},
+                            {"$facet": _explore_facets(dept_filter, tech_filter)},
+                        ]
+                    )
+                )
+                total = result["total"]
+                response["total"] = total[0]["count"] if total else 0
+                response["facets"] = {
+                    "departments": result["departments"],
+                    "technologies": result["technologies"],
+                }
 
-            logger.info(f"Returning {len(filtered_projects)} projects after filtering")
-            return filtered_projects
+            return response
 
         except Exception as e:
             logger.error(f"Error exploring projects: {e}")
             import traceback
 
             logger.error(traceback.format_exc())
-            return []
+            return {"data": [], "next_cursor": None}
 
     @staticmethod
     def create_request(student_id, project_id, message):
@@ -174,135 +326,47 @@ class Collaboration:
     def get_incoming_requests(user_id):
         """
         Get incoming collaboration requests.
-        """
-        try:
-            logger.info(f"Getting incoming requests for user_id: {user_id}")
 
-            # Convert user_id to string for consistent comparison
-            user_id_str = str(user_id)
+        Args:
+            user_id: User ID (project owner)
 
-            # Get all collaboration requests
-            all_requests = list(collaboration_requests.find())
-            logger.info(
-                f"Total collaboration requests in database: {len(all_requests)}"
+        Returns:
+            list: Requests with project and student details
+        """
+        try:
+            requests = list(
+                collaboration_requests.find(
+                    {"project_owner_id": {"$in": _id_variants(user_id)}}
+                ).sort("created_at", -1)
             )
 
-            # Get all projects
-            all_projects = list(projects_collection.find())
-            logger.info(f"Total projects in database: {len(all_projects)}")
-
-            # Get all users for later reference
-            all_users = list(users_collection.find())
-            logger.info(f"Total users in database: {len(all_users)}")
-
-            # Filter requests where user is project owner
-            incoming_requests = []
-
-            for req in all_requests:
-                # Get project owner ID
-                project_owner_id = req.get("project_owner_id")
-
-                # Convert to string if ObjectId
-                if isinstance(project_owner_id, ObjectId):
-                    project_owner_str = str(project_owner_id)
-                else:
-                    project_owner_str = str(project_owner_id)
-
-                # Compare with user ID
-                if project_owner_str == user_id_str:
-                    logger.info(
-                        f"Found incoming request {req.get('_id')} for project {req.get('project_id')}"
-                    )
-                    incoming_requests.append(req)
+            projects = _get_projects(req.get("project_id") for req in requests)
+            users = user_summaries.get_many(
+                [req.get("student_id") for req in requests]
+                + [
+                    msg.get("sender_id")
+                    for req in requests
+                    for msg in req.get("messages") or []
+                ]
+            )
 
             # Format requests with project and student details
             formatted_requests = []
 
-            for req in incoming_requests:
-                # Get project ID
-                project_id = req.get("project_id")
-
-                # Find matching project
-                matching_project = None
-                for p in all_projects:
-                    if str(p.get("_id")) == str(project_id):
-                        matching_project = p
-                        break
-
-                # Get student ID
-                student_id = req.get("student_id")
-
-                # Find matching student
-                matching_student = None
-                for u in all_users:
-                    if str(u.get("_id")) == str(student_id):
-                        matching_student = u
-                        break
+            for req in requests:
+                matching_project = projects.get(str(req.get("project_id")))
+                matching_student = users.get(str(req.get("student_id")))
 
                 if matching_project and matching_student:
-                    # Create formatted request
-                    formatted_req = {
-                        "_id": str(req.get("_id")),
-                        "status": req.get("status", "pending"),
-                        "message": req.get("message", ""),
-                        "created_at": (
-                            req.get("created_at").isoformat()
-                            if hasattr(req.get("created_at"), "isoformat")
-                            else str(req.get("created_at"))
-                        ),
-                        "updated_at": (
-                            req.get("updated_at").isoformat()
-                            if hasattr(req.get("updated_at"), "isoformat")
-                            else str(req.get("updated_at"))
-                        ),
-                        "project": {
-                            "_id": str(matching_project.get("_id")),
-                            "title": matching_project.get("title", "Untitled"),
-                            "abstract": matching_project.get("abstract", ""),
-                            "tech_stack": matching_project.get("tech_stack", []),
-                        },
-                        "student": {
-                            "_id": str(matching_student.get("_id")),
-                            "name": matching_student.get("name", "Unknown"),
-                            "dept": matching_student.get("dept", ""),
-                        },
+                    formatted_req = _format_request(req, matching_project, users)
+                    formatted_req["student"] = {
+                        "_id": str(matching_student.get("_id")),
+                        "name": matching_student.get("name", "Unknown"),
+                        "dept": matching_student.get("dept", ""),
                     }
 
-                    # Add messages if any
-                    if "messages" in req and req["messages"]:
-                        formatted_req["messages"] = []
-
-                        for msg in req["messages"]:
-                            sender_id = msg.get("sender_id")
-                            sender = None
-
-                            for u in all_users:
-                                if str(u.get("_id")) == str(sender_id):
-                                    sender = u
-                                    break
-
-                            formatted_req["messages"].append(
-                                {
-                                    "sender_id": str(sender_id),
-                                    "sender_name": (
-                                        sender.get("name", "Unknown")
-                                        if sender
-                                        else "Unknown"
-                                    ),
-                                    "content": msg.get("content", ""),
-                                    "sent_at": (
-                                        msg.get("sent_at").isoformat()
-                                        if hasattr(msg.get("sent_at"), "isoformat")
-                                        else str(msg.get("sent_at"))
-                                    ),
-                                }
-                            )
-
                     formatted_requests.append(formatted_req)
 
-            logger.info(
-                f"Returning {len(formatted_requests)} formatted incoming requests"
-            )
             return formatted_requests
 
         except Exception as e:
@@ -580,95 +644,41 @@ class Collaboration:
     def get_outgoing_requests(user_id):
         """
         Get outgoing collaboration requests.
-        """
-        try:
-            logger.info(f"Getting outgoing requests for user_id: {user_id}")
 
-            # Convert user_id to string for consistent comparison
-            user_id_str = str(user_id)
+        Args:
+            user_id: User ID (requester)
 
-            # Get all collaboration requests
-            all_requests = list(collaboration_requests.find())
-            logger.info(
-                f"Total collaboration requests in database: {len(all_requests)}"
+        Returns:
+            list: Requests with project and owner details
+        """
+        try:
+            requests = list(
+                collaboration_requests.find(
+                    {"student_id": {"$in": _id_variants(user_id)}}
+                ).sort("created_at", -1)
             )
 
-            # Get all projects
-            all_projects = list(projects_collection.find())
-            logger.info(f"Total projects in database: {len(all_projects)}")
-
-            # Get all users for later reference
-            all_users = list(users_collection.find())
-            logger.info(f"Total users in database: {len(all_users)}")
-
-            # Filter requests where user is student (requester)
-            outgoing_requests = []
-
-            for req in all_requests:
-                # Get student ID
-                student_id = req.get("student_id")
-
-                # Convert to string if ObjectId
-                if isinstance(student_id, ObjectId):
-                    student_id_str = str(student_id)
-                else:
-                    student_id_str = str(student_id)
-
-                # Compare with user ID
-                if student_id_str == user_id_str:
-                    logger.info(
-                        f"Found outgoing request {req.get('_id')} for project {req.get('project_id')}"
-                    )
-                    outgoing_requests.append(req)
+            projects = _get_projects(req.get("project_id") for req in requests)
+            users = user_summaries.get_many(
+                [project.get("created_by") for project in projects.values()]
+                + [
+                    msg.get("sender_id")
+                    for req in requests
+                    for msg in req.get("messages") or []
+                ]
+            )
 
             # Format requests with project and owner details
             formatted_requests = []
 
-            for req in outgoing_requests:
-                # Get project ID
-                project_id = req.get("project_id")
-
-                # Find matching project
-                matching_project = None
-                for p in all_projects:
-                    if str(p.get("_id")) == str(project_id):
-                        matching_project = p
-                        break
+            for req in requests:
+                matching_project = projects.get(str(req.get("project_id")))
 
                 if matching_project:
-                    # Get project owner
-                    owner_id = matching_project.get("created_by")
-                    matching_owner = None
-
-                    for u in all_users:
-                        if str(u.get("_id")) == str(owner_id):
-                            matching_owner = u
-                            break
-
-                    # Create formatted request
-                    formatted_req = {
-                        "_id": str(req.get("_id")),
-                        "status": req.get("status", "pending"),
-                        "message": req.get("message", ""),
-                        "created_at": (
-                            req.get("created_at").isoformat()
-                            if hasattr(req.get("created_at"), "isoformat")
-                            else str(req.get("created_at"))
-                        ),
-                        "updated_at": (
-                            req.get("updated_at").isoformat()
-                            if hasattr(req.get("updated_at"), "isoformat")
-                            else str(req.get("updated_at"))
-                        ),
-                        "project": {
-                            "_id": str(matching_project.get("_id")),
-                            "title": matching_project.get("title", "Untitled"),
-                            "abstract": matching_project.get("abstract", ""),
-                            "tech_stack": matching_project.get("tech_stack", []),
-                        },
-                    }
+                    formatted_req = _format_request(req, matching_project, users)
 
                     # Add owner details if found
+                    matching_owner = users.get(str(matching_project.get("created_by")))
                     if matching_owner:
                         formatted_req["project"]["owner_name"] = matching_owner.get(
                             "name", "Unknown"
@@ -677,41 +687,8 @@ class Collaboration:
                             "dept", ""
                         )
 
-                    # Add messages if any
-                    if "messages" in req and req["messages"]:
-                        formatted_req["messages"] = []
-
-                        for msg in req["messages"]:
-                            sender_id = msg.get("sender_id")
-                            sender = None
-
-                            for u in all_users:
-                                if str(u.get("_id")) == str(sender_id):
-                                    sender = u
-                                    break
-
-                            formatted_req["messages"].append(
-                                {
-                                    "sender_id": str(sender_id),
-                                    "sender_name": (
-                                        sender.get("name", "Unknown")
-                                        if sender
-                                        else "Unknown"
-                                    ),
-                                    "content": msg.get("content", ""),
-                                    "sent_at": (
-                                        msg.get("sent_at").isoformat()
-                                        if hasattr(msg.get("sent_at"), "isoformat")
-                                        else str(msg.get("sent_at"))
-                                    ),
-                                }
-                            )
-
                     formatted_requests.append(formatted_req)
 
-            logger.info(
-                f"Returning {len(formatted_requests)} formatted outgoing requests"
-            )
             return formatted_requests
 
         except Exception as e:
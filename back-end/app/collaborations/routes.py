@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.collaborations.models import Collaboration
+from app.collaborations.models import Collaboration, EXPLORE_PAGE_SIZE
 from app.auth.models import User
 from app.projects.models import Project
 from app.utils.validators import validate_user_input
@@ -15,25 +15,29 @@ collaborations_bp = Blueprint("collaborations", __name__)
 def explore_projects():
     try:
         current_user = get_jwt_identity()
-        current_app.logger.info(f"Current user email: {current_user}")
 
         user = User.find_by_email(current_user)
         if not user:
             current_app.logger.error(f"User not found for email: {current_user}")
             return jsonify({"message": "User not found"}), 404
 
-        current_app.logger.info(
-            f"Found user: {user.get('name')}, ID: {user.get('_id')}"
-        )
-
         # Get query parameters
         dept = request.args.get("dept")
         tech = request.args.get("tech")
+        cursor = request.args.get("cursor")
 
         # Get projects for collaboration
-        projects = Collaboration.explore_projects(str(user["_id"]), dept, tech)
+        try:
+            projects = Collaboration.explore_projects(
+                str(user["_id"]),
+                dept,
+                tech,
+                cursor,
+                int(request.args.get("limit", EXPLORE_PAGE_SIZE)),
+            )
+        except ValueError:
+            return jsonify({"message": "Invalid cursor or limit"}), 400
 
-        current_app.logger.info(f"Returning {len(projects)} projects to client")
         return jsonify(projects), 200
 
     except Exception as e:
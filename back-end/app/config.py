@@ -28,6 +28,39 @@ class Config:
     MONGODB_SETTINGS = {
         "host": os.environ.get("MONGODB_URI", "mongodb://localhost:27017/imperious")
     }
+    # Reconcile declared indexes when the app starts (see `flask indexes sync`)
+    ENSURE_INDEXES = os.environ.get("ENSURE_INDEXES", "False").lower() in [
+        "true",
+        "1",
+        "yes",
+    ]
+
+    # Socket.IO settings
+    # "threading" (default) or "gevent"/"eventlet" for high concurrency. The
+    # entry point monkey patches from the same SOCKETIO_ASYNC_MODE variable.
+    SOCKETIO_ASYNC_MODE = os.environ.get("SOCKETIO_ASYNC_MODE", "threading")
+    # Message queue shared by all workers, e.g. redis://localhost:6379/0
+    # (needs the redis package). None keeps the in-process manager, which
+    # only works with a single worker.
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE")
+    # "memory" for a single worker, "mongo" to share presence across workers
+    PRESENCE_BACKEND = os.environ.get("PRESENCE_BACKEND", "memory")
+    PRESENCE_TTL = int(os.environ.get("PRESENCE_TTL", 90))
+    # Seconds socket messages are buffered before being written in a batch
+    MESSAGE_FLUSH_INTERVAL = float(os.environ.get("MESSAGE_FLUSH_INTERVAL", 0.05))
+
+    # Load the student registry into memory at startup for signup checks
+    # (skipped for flask CLI commands), and how often (seconds) each worker
+    # checks whether it was reimported
+    STUDENT_INDEX_PRELOAD = os.environ.get("STUDENT_INDEX_PRELOAD", "True").lower() in [
+        "true",
+        "1",
+        "yes",
+    ]
+    STUDENT_INDEX_REFRESH = int(os.environ.get("STUDENT_INDEX_REFRESH", 60))
+
+    # Seconds the analytics dashboard snapshot is reused before recomputing
+    ANALYTICS_SNAPSHOT_MAX_AGE = int(os.environ.get("ANALYTICS_SNAPSHOT_MAX_AGE", 300))
 
     # Email settings
     MAIL_SERVER = os.environ.get("MAIL_SERVER", "smtp.gmail.com")
@@ -88,6 +121,10 @@ class TestingConfig(Config):
 
     TESTING = True
     DEBUG = True
+    SOCKETIO_MESSAGE_QUEUE = None
+    PRESENCE_BACKEND = "memory"
+    # Load the registry on the first signup check instead of at startup
+    STUDENT_INDEX_PRELOAD = False
     # Use a separate test database
     MONGODB_SETTINGS = {
         "host": os.environ.get(
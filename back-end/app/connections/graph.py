@@ -0,0 +1,155 @@
+from app.models.base import connections_collection, connection_requests_collection
+from app.utils.cache import TTLCache
+
+# Fields an adjacency needs from each edge document
+CONNECTION_FIELDS = {"user1_id": 1, "user2_id": 1, "updated_at": 1}
+REQUEST_FIELDS = {"from_user_id": 1, "to_user_id": 1, "created_at": 1}
+
+
+def pair_key(user1_id, user2_id):
+    """Canonical key of an unordered pair of users, the same both ways."""
+    return ":".join(sorted([str(user1_id), str(user2_id)]))
+
+
+class Adjacency:
+    """
+    One user's edges: accepted connections and pending requests in each
+    direction, each keyed by the other user's ID.
+    """
+
+    __slots__ = ("connected", "sent", "received")
+
+    def __init__(self):
+        self.connected = {}
+        self.sent = {}
+        self.received = {}
+
+    @classmethod
+    def build(cls, user_id, connections, requests):
+        """
+        Index connection and pending request documents from one user's
+        point of view.
+
+        Args:
+            user_id: The user's ID
+            connections: Accepted connection documents involving the user
+            requests: Pending request documents involving the user
+
+        Returns:
+            Adjacency: The user's edges
+        """
+        adjacency = cls()
+
+        for connection in connections:
+            other_id = (
+                connection["user2_id"]
+                if connection["user1_id"] == user_id
+                else connection["user1_id"]
+            )
+            adjacency.connected[other_id] = connection
+
+        for request in requests:
+            if request["from_user_id"] == user_id:
+                adjacency.sent[request["to_user_id"]] = request
+            else:
+                adjacency.received[request["from_user_id"]] = request
+
+        return adjacency
+
+    def status(self, other_id):
+        """
+        Describe the relationship with another user.
+
+        Args:
+            other_id: The other user's ID
+
+        Returns:
+            dict: Status as returned by Connection.get_connection_status
+        """
+        connection = self.connected.get(other_id)
+        if connection:
+            return {
+                "status": "connected",
+                "connection_id": str(connection["_id"]),
+                "connected_at": connection["updated_at"].isoformat(),
+            }
+
+        for status, requests in [
+            ("pending_sent", self.sent),
+            ("pending_received", self.received),
+        ]:
+            request = requests.get(other_id)
+            if request:
+                return {
+                    "status": status,
+                    "request_id": str(request["_id"]),
+                    "created_at": request["created_at"].isoformat(),
+                }
+
+        return {"status": "not_connected"}
+
+
+class ConnectionGraph:
+    """
+    In-process cache of each user's adjacency, loaded with two queries and
+    dropped whenever one of that user's edges changes.
+
+    Invalidation only reaches this process; other workers see a change
+    once their entry expires. Duplicate edges are prevented by the unique
+    pair_key indexes, not by this cache.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self._adjacency = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def adjacency(self, user_id):
+        """
+        Get a user's connections and pending requests.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Adjacency: The user's edges
+        """
+        adjacency = self._adjacency.get(user_id)
+        if adjacency is not None:
+            return adjacency
+
+        adjacency = Adjacency.build(
+            user_id,
+            connections_collection.find(
+                {
+                    "status": "accepted",
+                    "$or": [{"user1_id": user_id}, {"user2_id": user_id}],
+                },
+                CONNECTION_FIELDS,
+            ),
+            connection_requests_collection.find(
+                {
+                    "status": "pending",
+                    "$or": [{"from_user_id": user_id}, {"to_user_id": user_id}],
+                },
+                REQUEST_FIELDS,
+            ),
+        )
+
+        self._adjacency.set(user_id, adjacency)
+        return adjacency
+
+    def connection_ids(self, user_id):
+        """Get the IDs of a user's accepted connections."""
+        return list(self.adjacency(user_id).connected)
+
+    def are_connected(self, user1_id, user2_id):
+        """Check whether two users are connected."""
+        return user2_id in self.adjacency(user1_id).connected
+
+    def invalidate(self, *user_ids):
+        """Drop the cached adjacency of the given users."""
+        for user_id in user_ids:
+            self._adjacency.pop(str(user_id))
+
+
+# Shared instance used by connection and feed code
+connection_graph = ConnectionGraph()
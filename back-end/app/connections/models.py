@@ -1,14 +1,195 @@
 from app.models.base import (
     connections_collection,
     connection_requests_collection,
-    users_collection,
 )
+from app.connections.graph import connection_graph, pair_key
+from app.connections.suggestions import Suggestions
+from app.feeds.models import Timeline
+from app.utils.helpers import decode_cursor, encode_cursor, keyset_filter
 from bson import ObjectId
 from datetime import datetime, timezone
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from pymongo.errors import DuplicateKeyError
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Most user IDs accepted by one batched status lookup
+CONNECTION_STATUS_BATCH_MAX = 100
+
+INDEXES = {
+    "connections": [
+        # Each $or branch of a connection list reads in updated_at order
+        IndexModel(
+            [
+                ("user1_id", ASCENDING),
+                ("status", ASCENDING),
+                ("updated_at", DESCENDING),
+            ],
+            name="user1_id_1_status_1_updated_at_-1",
+        ),
+        IndexModel(
+            [
+                ("user2_id", ASCENDING),
+                ("status", ASCENDING),
+                ("updated_at", DESCENDING),
+            ],
+            name="user2_id_1_status_1_updated_at_-1",
+        ),
+        # One edge per pair of users, whichever way round it was created
+        IndexModel(
+            [("pair_key", ASCENDING)],
+            name="pair_key_1",
+            unique=True,
+            partialFilterExpression={"pair_key": {"$type": "string"}},
+        ),
+    ],
+    "connection_requests": [
+        IndexModel(
+            [
+                ("to_user_id", ASCENDING),
+                ("status", ASCENDING),
+                ("created_at", DESCENDING),
+            ],
+            name="to_user_id_1_status_1_created_at_-1",
+        ),
+        IndexModel(
+            [("from_user_id", ASCENDING), ("status", ASCENDING)],
+            name="from_user_id_1_status_1",
+        ),
+        # At most one pending request per pair, in either direction
+        IndexModel(
+            [("pair_key", ASCENDING)],
+            name="pair_key_1_pending",
+            unique=True,
+            partialFilterExpression={
+                "status": "pending",
+                "pair_key": {"$type": "string"},
+            },
+        ),
+    ],
+}
+
+
+CONNECTION_PAGE_SIZE = 20
+CONNECTION_PAGE_SIZE_MAX = 100
+# Sort options for connection lists: field sorted on and direction. "name"
+# sorts by the other user's name, so it pages after the $lookup
+CONNECTION_SORTS = {
+    "recent": DESCENDING,
+    "oldest": ASCENDING,
+    "name": ASCENDING,
+}
+
+# User fields returned with each connection or request
+USER_CARD_PROJECTION = {
+    "name": 1,
+    "email": 1,
+    "role": 1,
+    "dept": 1,
+    "batch": 1,
+    "photo_url": 1,
+}
+
+
+def _user_card(user):
+    """Format a looked-up user for connection lists."""
+    return {
+        "_id": str(user["_id"]),
+        "name": user["name"],
+        "email": user["email"],
+        "role": user["role"],
+        "dept": user.get("dept", ""),
+        "batch": user.get("batch", ""),
+        "photo_url": user.get("photo_url", ""),
+    }
+
+
+def _hydrated_page(collection, match, time_field, other_id, cursor, limit, sort):
+    """
+    Fetch a page of edges joined to the other user with one aggregation.
+
+    Edges whose other user is missing or has a malformed ID are dropped.
+    Time sorts page before the join, so such edges are removed after the
+    limit: a page can then hold fewer than limit edges while next_cursor
+    is still set. Clients should page until next_cursor is None, not
+    until a page comes back short.
+
+    Args:
+        collection: connections or connection_requests collection
+        match: Filter selecting the viewer's edges
+        time_field: Timestamp the "recent" and "oldest" sorts use
+        other_id: Expression giving the other user's ID on each edge
+        cursor: Cursor from a previous page, or None
+        limit: Page size, or None for every edge
+        sort: Key of CONNECTION_SORTS
+
+    Returns:
+        tuple: (edges with a "user" document, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor or sort is invalid
+    """
+    if sort not in CONNECTION_SORTS:
+        raise ValueError("Invalid sort")
+
+    direction = CONNECTION_SORTS[sort]
+    sort_field = "user.name" if sort == "name" else time_field
+    page_filter = (
+        keyset_filter(sort_field, decode_cursor(cursor), direction) if cursor else None
+    )
+
+    lookup = [
+        # A malformed ID converts to null and drops out like a missing user
+        {
+            "$addFields": {
+                "other_id": {
+                    "$convert": {
+                        "input": other_id,
+                        "to": "objectId",
+                        "onError": None,
+                        "onNull": None,
+                    }
+                }
+            }
+        },
+        {
+            "$lookup": {
+                "from": "users",
+                "localField": "other_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": USER_CARD_PROJECTION}],
+                "as": "user",
+            }
+        },
+        {"$set": {"user": {"$arrayElemAt": ["$user", 0]}}},
+    ]
+    paging = [{"$sort": {sort_field: direction, "_id": direction}}]
+    if page_filter:
+        paging.insert(0, {"$match": page_filter})
+    if limit:
+        # One extra row tells whether another page exists
+        paging.append({"$limit": limit + 1})
+
+    # Time sorts page before the join so only one page of users is read
+    if sort == "name":
+        lookup.append({"$match": {"user._id": {"$exists": True}}})
+        pipeline = [{"$match": match}] + lookup + paging
+    else:
+        pipeline = [{"$match": match}] + paging + lookup
+
+    edges = list(collection.aggregate(pipeline))
+
+    next_cursor = None
+    if limit and len(edges) > limit:
+        edges = edges[:limit]
+        last = edges[-1]
+        key = last["user"]["name"] if sort == "name" else last[time_field]
+        next_cursor = encode_cursor(key, last["_id"])
+
+    # Edges whose user no longer exists are dropped
+    return [edge for edge in edges if edge.get("user")], next_cursor
+
 
 class Connection:
     @staticmethod
@@ -23,52 +204,60 @@ class Connection:
             list: List of connections with connected user details
         """
         try:
-            # Find all accepted connections where user is either user1 or user2
-            connections = list(
-                connections_collection.find(
-                    {
-                        "$and": [
-                            {"status": "accepted"},
-                            {"$or": [{"user1_id": user_id}, {"user2_id": user_id}]},
-                        ]
-                    }
-                )
-            )
-
-            result = []
-            for connection in connections:
-                # Determine which user ID is the other user
-                other_user_id = (
-                    connection["user2_id"]
-                    if connection["user1_id"] == user_id
-                    else connection["user1_id"]
-                )
-
-                # Get user details
-                other_user = users_collection.find_one({"_id": ObjectId(other_user_id)})
-
-                if other_user:
-                    result.append(
-                        {
-                            "connection_id": str(connection["_id"]),
-                            "connected_at": connection["updated_at"].isoformat(),
-                            "user": {
-                                "_id": str(other_user["_id"]),
-                                "name": other_user["name"],
-                                "email": other_user["email"],
-                                "role": other_user["role"],
-                                "dept": other_user.get("dept", ""),
-                                "batch": other_user.get("batch", ""),
-                                "photo_url": other_user.get("photo_url", ""),
-                            },
-                        }
-                    )
-
-            return result
+            return Connection.get_connections_page(user_id, limit=None)["connections"]
         except Exception as e:
             logger.error(f"Error in get_user_connections: {str(e)}")
             return []
 
+    @staticmethod
+    def get_connections_page(
+        user_id, cursor=None, limit=CONNECTION_PAGE_SIZE, sort="recent"
+    ):
+        """
+        Get a page of a user's connections, joined to the connected users'
+        details in one aggregation.
+
+        Args:
+            user_id (str): The user's ID
+            cursor: next_cursor of the previous page (optional)
+            limit: Page size (capped at CONNECTION_PAGE_SIZE_MAX), or None
+                   for every connection
+            sort: "recent", "oldest" or "name"
+
+        Returns:
+            dict: connections and next_cursor
+
+        Raises:
+            ValueError: If the cursor or sort is invalid
+        """
+        if limit is not None:
+            limit = max(1, min(int(limit), CONNECTION_PAGE_SIZE_MAX))
+
+        connections, next_cursor = _hydrated_page(
+            connections_collection,
+            {
+                "status": "accepted",
+                "$or": [{"user1_id": user_id}, {"user2_id": user_id}],
+            },
+            "updated_at",
+            {"$cond": [{"$eq": ["$user1_id", user_id]}, "$user2_id", "$user1_id"]},
+            cursor,
+            limit,
+            sort,
+        )
+
+        return {
+            "connections": [
+                {
+                    "connection_id": str(connection["_id"]),
+                    "connected_at": connection["updated_at"].isoformat(),
+                    "user": _user_card(connection["user"]),
+                }
+                for connection in connections
+            ],
+            "next_cursor": next_cursor,
+        }
+
     @staticmethod
     def get_connection_status(user1_id, user2_id):
         """
@@ -82,67 +271,33 @@ class Connection:
             dict: Connection status information
         """
         try:
-            # Check if already connected
-            connection = connections_collection.find_one(
-                {
-                    "$and": [
-                        {
-                            "$or": [
-                                {
-                                    "$and": [
-                                        {"user1_id": user1_id},
-                                        {"user2_id": user2_id},
-                                    ]
-                                },
-                                {
-                                    "$and": [
-                                        {"user1_id": user2_id},
-                                        {"user2_id": user1_id},
-                                    ]
-                                },
-                            ]
-                        },
-                        {"status": "accepted"},
-                    ]
-                }
-            )
-
-            if connection:
-                return {
-                    "status": "connected",
-                    "connection_id": str(connection["_id"]),
-                    "connected_at": connection["updated_at"].isoformat(),
-                }
+            return connection_graph.adjacency(user1_id).status(user2_id)
+        except Exception as e:
+            logger.error(f"Error in get_connection_status: {str(e)}")
+            return {"status": "error", "message": str(e)}
 
-            # Check if there's a pending request from user1 to user2
-            sent_request = connection_requests_collection.find_one(
-                {"from_user_id": user1_id, "to_user_id": user2_id, "status": "pending"}
-            )
+    @staticmethod
+    def get_connection_statuses(user_id, other_user_ids):
+        """
+        Check the connection status between a user and many others from
+        the user's cached adjacency, for directory and search result pages.
 
-            if sent_request:
-                return {
-                    "status": "pending_sent",
-                    "request_id": str(sent_request["_id"]),
-                    "created_at": sent_request["created_at"].isoformat(),
-                }
+        Edges are matched on the user ID fields, like get_connection_status,
+        so connections created before pair_key was backfilled are reported
+        the same way by both.
 
-            # Check if there's a pending request from user2 to user1
-            received_request = connection_requests_collection.find_one(
-                {"from_user_id": user2_id, "to_user_id": user1_id, "status": "pending"}
-            )
+        Args:
+            user_id (str): The viewing user's ID
+            other_user_ids (list): IDs of the users shown
 
-            if received_request:
-                return {
-                    "status": "pending_received",
-                    "request_id": str(received_request["_id"]),
-                    "created_at": received_request["created_at"].isoformat(),
-                }
+        Returns:
+            dict: Status information keyed by other user ID, shaped like
+                  get_connection_status
+        """
+        other_user_ids = list(dict.fromkeys(other_user_ids))
+        adjacency = connection_graph.adjacency(user_id)
 
-            # No connection or pending request
-            return {"status": "not_connected"}
-        except Exception as e:
-            logger.error(f"Error in get_connection_status: {str(e)}")
-            return {"status": "error", "message": str(e)}
+        return {other_id: adjacency.status(other_id) for other_id in other_user_ids}
 
     @staticmethod
     def get_pending_requests(user_id):
@@ -156,42 +311,57 @@ class Connection:
             list: List of pending connection requests
         """
         try:
-            # Get pending connection requests directed to the user
-            requests = list(
-                connection_requests_collection.find(
-                    {"to_user_id": user_id, "status": "pending"}
-                ).sort("created_at", -1)
-            )
-
-            result = []
-            for request in requests:
-                # Get sender details
-                from_user = users_collection.find_one(
-                    {"_id": ObjectId(request["from_user_id"])}
-                )
-
-                if from_user:
-                    result.append(
-                        {
-                            "_id": str(request["_id"]),
-                            "created_at": request["created_at"].isoformat(),
-                            "from_user": {
-                                "_id": str(from_user["_id"]),
-                                "name": from_user["name"],
-                                "email": from_user["email"],
-                                "role": from_user["role"],
-                                "dept": from_user.get("dept", ""),
-                                "batch": from_user.get("batch", ""),
-                                "photo_url": from_user.get("photo_url", ""),
-                            },
-                        }
-                    )
-
-            return result
+            return Connection.get_pending_requests_page(user_id, limit=None)["requests"]
         except Exception as e:
             logger.error(f"Error in get_pending_requests: {str(e)}")
             return []
 
+    @staticmethod
+    def get_pending_requests_page(
+        user_id, cursor=None, limit=CONNECTION_PAGE_SIZE, sort="recent"
+    ):
+        """
+        Get a page of the pending requests sent to a user, joined to the
+        senders' details in one aggregation.
+
+        Args:
+            user_id (str): The user's ID
+            cursor: next_cursor of the previous page (optional)
+            limit: Page size (capped at CONNECTION_PAGE_SIZE_MAX), or None
+                   for every request
+            sort: "recent", "oldest" or "name"
+
+        Returns:
+            dict: requests and next_cursor
+
+        Raises:
+            ValueError: If the cursor or sort is invalid
+        """
+        if limit is not None:
+            limit = max(1, min(int(limit), CONNECTION_PAGE_SIZE_MAX))
+
+        requests, next_cursor = _hydrated_page(
+            connection_requests_collection,
+            {"to_user_id": user_id, "status": "pending"},
+            "created_at",
+            "$from_user_id",
+            cursor,
+            limit,
+            sort,
+        )
+
+        return {
+            "requests": [
+                {
+                    "_id": str(request["_id"]),
+                    "created_at": request["created_at"].isoformat(),
+                    "from_user": _user_card(request["user"]),
+                }
+                for request in requests
+            ],
+            "next_cursor": next_cursor,
+        }
+
     @staticmethod
     def create_request(from_user_id, to_user_id):
         """
@@ -213,55 +383,17 @@ class Connection:
                     "status_code": 400,
                 }
 
-            # Check if already connected
-            existing_connection = connections_collection.find_one(
-                {
-                    "$or": [
-                        {
-                            "$and": [
-                                {"user1_id": from_user_id},
-                                {"user2_id": to_user_id},
-                            ]
-                        },
-                        {
-                            "$and": [
-                                {"user1_id": to_user_id},
-                                {"user2_id": from_user_id},
-                            ]
-                        },
-                    ]
-                }
-            )
+            # Check for a connection or a pending request in either direction
+            status = connection_graph.adjacency(from_user_id).status(to_user_id)
 
-            if existing_connection:
+            if status["status"] == "connected":
                 return {
                     "success": False,
                     "message": "Connection already exists",
                     "status_code": 400,
                 }
 
-            # Check if there's already a pending request in either direction
-            existing_request = connection_requests_collection.find_one(
-                {
-                    "$or": [
-                        {
-                            "$and": [
-                                {"from_user_id": from_user_id},
-                                {"to_user_id": to_user_id},
-                            ]
-                        },
-                        {
-                            "$and": [
-                                {"from_user_id": to_user_id},
-                                {"to_user_id": from_user_id},
-                            ]
-                        },
-                    ],
-                    "status": "pending",
-                }
-            )
-
-            if existing_request:
+            if status["status"] != "not_connected":
                 return {
                     "success": False,
                     "message": "Connection request already exists",
@@ -272,12 +404,23 @@ class Connection:
             new_request = {
                 "from_user_id": from_user_id,
                 "to_user_id": to_user_id,
+                "pair_key": pair_key(from_user_id, to_user_id),
                 "status": "pending",
                 "created_at": datetime.now(timezone.utc),
                 "updated_at": datetime.now(timezone.utc),
             }
 
-            result = connection_requests_collection.insert_one(new_request)
+            try:
+                result = connection_requests_collection.insert_one(new_request)
+            except DuplicateKeyError:
+                # A concurrent request for the same pair got there first
+                return {
+                    "success": False,
+                    "message": "Connection request already exists",
+                    "status_code": 400,
+                }
+            finally:
+                connection_graph.invalidate(from_user_id, to_user_id)
 
             return {"success": True, "request_id": str(result.inserted_id)}
         except Exception as e:
@@ -305,37 +448,46 @@ class Connection:
             if status not in ["accepted", "rejected"]:
                 return False
 
-            # Find the connection request
-            connection_request = connection_requests_collection.find_one(
+            # Claim the pending request, so only one response wins
+            connection_request = connection_requests_collection.find_one_and_update(
                 {
                     "_id": ObjectId(request_id),
                     "to_user_id": user_id,
                     "status": "pending",
-                }
+                },
+                {"$set": {"status": status, "updated_at": datetime.now(timezone.utc)}},
             )
 
             if not connection_request:
                 return False
 
-            # Update the request status
-            connection_requests_collection.update_one(
-                {"_id": ObjectId(request_id)},
-                {"$set": {"status": status, "updated_at": datetime.now(timezone.utc)}},
-            )
+            from_user_id = connection_request["from_user_id"]
+            connection_graph.invalidate(from_user_id, user_id)
 
             # If accepted, create a connection
             if status == "accepted":
-                from_user_id = connection_request["from_user_id"]
-
                 new_connection = {
                     "user1_id": from_user_id,
                     "user2_id": user_id,
+                    "pair_key": pair_key(from_user_id, user_id),
                     "status": "accepted",
                     "created_at": datetime.now(timezone.utc),
                     "updated_at": datetime.now(timezone.utc),
                 }
 
-                connections_collection.insert_one(new_connection)
+                try:
+                    connections_collection.insert_one(new_connection)
+                except DuplicateKeyError:
+                    # Already connected; nothing more to link
+                    return True
+
+                Suggestions.mark_stale(from_user_id, user_id)
+
+                # Let each user's home timeline see the other's posts
+                try:
+                    Timeline.on_connected(from_user_id, user_id)
+                except Exception as timeline_error:
+                    logger.warning(f"Timeline link failed: {timeline_error}")
 
             return True
         except Exception as e:
@@ -368,7 +520,75 @@ class Connection:
 
             # Delete the connection
             result = connections_collection.delete_one({"_id": ObjectId(connection_id)})
+            connection_graph.invalidate(connection["user1_id"], connection["user2_id"])
+            Suggestions.mark_stale(connection["user1_id"], connection["user2_id"])
+
+            # Stop each user's home timeline from reading the other's posts
+            if result.deleted_count:
+                try:
+                    Timeline.on_disconnected(
+                        connection["user1_id"], connection["user2_id"]
+                    )
+                except Exception as timeline_error:
+                    logger.warning(f"Timeline unlink failed: {timeline_error}")
+
             return result.deleted_count > 0
         except Exception as e:
             logger.error(f"Error in remove_connection: {str(e)}")
             return False
+
+    @staticmethod
+    def backfill_pair_keys():
+        """
+        Add pair_key to connections and pending requests created before it
+        existed, so the unique pair indexes can cover them.
+
+        Duplicate edges left by past races are removed first, keeping the
+        oldest connection and the oldest pending request of each pair.
+
+        Returns:
+            dict: Counts of updated and removed connections and requests
+        """
+        report = {}
+
+        for name, collection, query, fields in [
+            (
+                "connections",
+                connections_collection,
+                {},
+                ("user1_id", "user2_id"),
+            ),
+            (
+                "requests",
+                connection_requests_collection,
+                {"status": "pending"},
+                ("from_user_id", "to_user_id"),
+            ),
+        ]:
+            seen = set()
+            duplicates = []
+            operations = []
+
+            for edge in collection.find(
+                query, {fields[0]: 1, fields[1]: 1, "pair_key": 1}
+            ).sort([("created_at", ASCENDING), ("_id", ASCENDING)]):
+                key = pair_key(edge[fields[0]], edge[fields[1]])
+                if key in seen:
+                    duplicates.append(edge["_id"])
+                    continue
+
+                seen.add(key)
+                if edge.get("pair_key") != key:
+                    operations.append(
+                        UpdateOne({"_id": edge["_id"]}, {"$set": {"pair_key": key}})
+                    )
+
+            if duplicates:
+                collection.delete_many({"_id": {"$in": duplicates}})
+            if operations:
+                collection.bulk_write(operations, ordered=False)
+
+            report[f"{name}_updated"] = len(operations)
+            report[f"{name}_removed"] = len(duplicates)
+
+        return report
@@ -1,12 +1,33 @@
 from flask import Blueprint, request, jsonify, current_app
+import click
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.connections.models import Connection
+from app.connections.models import (
+    Connection,
+    CONNECTION_PAGE_SIZE,
+    CONNECTION_STATUS_BATCH_MAX,
+)
+from app.connections.suggestions import Suggestions, SUGGESTION_LIMIT
 from app.auth.models import User
 from bson import ObjectId
 from datetime import datetime, timezone
 
 connections_bp = Blueprint('connections', __name__)
 
+
+def _paging_requested():
+    """Whether a list request asks for cursor pagination."""
+    return any(request.args.get(arg) for arg in ["cursor", "limit", "sort"])
+
+
+def _paging_args():
+    """Read cursor, limit and sort for a paginated connection list."""
+    return {
+        "cursor": request.args.get("cursor"),
+        "limit": request.args.get("limit", CONNECTION_PAGE_SIZE),
+        "sort": request.args.get("sort", "recent"),
+    }
+
+
 @connections_bp.route('', methods=['GET'])
 @jwt_required()
 def get_user_connections():
@@ -18,7 +39,15 @@ def get_user_connections():
             return jsonify({"message": "User not found"}), 404
         
         user_id = str(user["_id"])
-        
+
+        # Paginated when any paging parameter is given
+        if _paging_requested():
+            try:
+                page = Connection.get_connections_page(user_id, **_paging_args())
+            except ValueError:
+                return jsonify({"message": "Invalid cursor, limit or sort"}), 400
+            return jsonify(page), 200
+
         # Get connections
         connections = Connection.get_user_connections(user_id)
         
@@ -39,17 +68,31 @@ def get_specific_user_connections(user_id):
         if not user:
             return jsonify({"message": "User not found"}), 404
         
-        # Get connections
-        connections = Connection.get_user_connections(user_id)
-        
         # Check if we should limit the connections shown
         current_user_obj = User.find_by_email(current_user)
         is_own_profile = user_id == str(current_user_obj["_id"])
         is_admin = current_user_obj["role"].lower() in ["admin", "staff"]
-        
-        if not is_own_profile and not is_admin:
+        is_limited = not is_own_profile and not is_admin
+
+        if _paging_requested():
+            paging = _paging_args()
+            try:
+                if is_limited:
+                    # Only the first 10 connections are shown, without further pages
+                    paging["cursor"] = None
+                    paging["limit"] = min(int(paging["limit"]), 10)
+                page = Connection.get_connections_page(user_id, **paging)
+            except ValueError:
+                return jsonify({"message": "Invalid cursor, limit or sort"}), 400
+            if is_limited:
+                page["next_cursor"] = None
+            return jsonify(page), 200
+
+        if is_limited:
             # Limit the number of connections shown
-            connections = connections[:10]
+            connections = Connection.get_connections_page(user_id, limit=10)["connections"]
+        else:
+            connections = Connection.get_user_connections(user_id)
         
         return jsonify(connections), 200
         
@@ -78,6 +121,64 @@ def check_connection_status(user_id):
         current_app.logger.error(f"Error checking connection status: {str(e)}")
         return jsonify({"message": "Internal server error"}), 500
 
+
+@connections_bp.route('/status', methods=['POST'])
+@jwt_required()
+def check_connection_statuses():
+    try:
+        current_user = get_jwt_identity()
+        current_user_obj = User.find_by_email(current_user)
+
+        if not current_user_obj:
+            return jsonify({"message": "Current user not found"}), 404
+
+        data = request.get_json() or {}
+        user_ids = data.get("userIds")
+
+        if not isinstance(user_ids, list) or not all(isinstance(uid, str) for uid in user_ids):
+            return jsonify({"message": "userIds must be a list of user IDs"}), 400
+
+        if len(user_ids) > CONNECTION_STATUS_BATCH_MAX:
+            return jsonify({"message": f"At most {CONNECTION_STATUS_BATCH_MAX} user IDs per request"}), 400
+
+        current_user_id = str(current_user_obj["_id"])
+
+        # Resolve every card's status in one query per collection
+        statuses = Connection.get_connection_statuses(current_user_id, user_ids)
+
+        return jsonify(statuses), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error checking connection statuses: {str(e)}")
+        return jsonify({"message": "Internal server error"}), 500
+
+
+@connections_bp.route('/suggestions', methods=['GET'])
+@jwt_required()
+def get_connection_suggestions():
+    try:
+        current_user = get_jwt_identity()
+        current_user_obj = User.find_by_email(current_user)
+
+        if not current_user_obj:
+            return jsonify({"message": "User not found"}), 404
+
+        try:
+            limit = min(int(request.args.get("limit", 10)), SUGGESTION_LIMIT)
+        except ValueError:
+            return jsonify({"message": "limit must be a number"}), 400
+
+        current_user_id = str(current_user_obj["_id"])
+
+        # Precomputed by `flask connections compute-suggestions`
+        suggestions = Suggestions.get_for_user(current_user_id, max(limit, 1))
+
+        return jsonify(suggestions), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting connection suggestions: {str(e)}")
+        return jsonify({"message": "Internal server error"}), 500
+
 @connections_bp.route('/requests', methods=['GET'])
 @jwt_required()
 def get_connection_requests():
@@ -89,7 +190,15 @@ def get_connection_requests():
             return jsonify({"message": "User not found"}), 404
         
         current_user_id = str(current_user_obj["_id"])
-        
+
+        # Paginated when any paging parameter is given
+        if _paging_requested():
+            try:
+                page = Connection.get_pending_requests_page(current_user_id, **_paging_args())
+            except ValueError:
+                return jsonify({"message": "Invalid cursor, limit or sort"}), 400
+            return jsonify(page), 200
+
         # Get connection requests
         requests = Connection.get_pending_requests(current_user_id)
         
@@ -190,4 +299,24 @@ def remove_connection(connection_id):
         
     except Exception as e:
         current_app.logger.error(f"Error removing connection: {str(e)}")
-        return jsonify({"message": "Internal server error"}), 500
\ No newline at end of file
+        return jsonify({"message": "Internal server error"}), 500
+
+
+@connections_bp.cli.command("backfill-pair-keys")
+def backfill_pair_keys():
+    """Add pair keys to existing edges and remove duplicate edges."""
+    report = Connection.backfill_pair_keys()
+    click.echo(
+        f"Connections: {report['connections_updated']} updated, "
+        f"{report['connections_removed']} duplicates removed; "
+        f"pending requests: {report['requests_updated']} updated, "
+        f"{report['requests_removed']} duplicates removed"
+    )
+
+
+@connections_bp.cli.command("compute-suggestions")
+@click.option("--full", is_flag=True, help="Recompute every user, not just stale ones")
+def compute_suggestions(full):
+    """Recompute people-you-may-know suggestions (run on a schedule)."""
+    report = Suggestions.compute(full=full)
+    click.echo(f"Computed suggestions for {report['computed']} of {report['users']} users")
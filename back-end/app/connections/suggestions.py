@@ -0,0 +1,300 @@
+from app.models.base import (
+    connections_collection,
+    connection_requests_collection,
+    suggestions_collection,
+    users_collection,
+)
+from app.connections.graph import connection_graph
+from app.utils.cache import user_summaries
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, IndexModel, ReplaceOne
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    "connection_suggestions": [
+        IndexModel([("computed_at", ASCENDING)], name="computed_at_1"),
+    ],
+}
+
+# Suggestions stored per user, and how many candidates are fully scored
+SUGGESTION_LIMIT = 20
+SUGGESTION_CANDIDATES = 200
+# Seconds before a user's suggestions are recomputed even if not marked
+# stale, so profile changes and second-degree edges are picked up
+SUGGESTION_MAX_AGE = 24 * 60 * 60
+SUGGESTION_WRITE_BATCH = 1000
+
+# Score weights: each mutual connection, shared department, shared batch
+# and full skill overlap (Jaccard similarity scales the last)
+MUTUAL_WEIGHT = 1.0
+DEPT_WEIGHT = 2.0
+BATCH_WEIGHT = 1.5
+SKILLS_WEIGHT = 3.0
+
+
+def _neighbors_of(indptr, indices, rows):
+    """Concatenate the adjacency rows of several nodes without a loop."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, dtype=indices.dtype)
+
+    # Position of every gathered element in indices: its row start plus its
+    # offset inside the row
+    row_offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return indices[row_offsets + np.arange(total)]
+
+
+def _codes(users, field):
+    """Map a field's values to integer codes for vectorized matching; -1 if unset."""
+    values = {}
+    return np.array(
+        [
+            values.setdefault(user[field], len(values)) if user.get(field) else -1
+            for user in users
+        ],
+        dtype=np.int64,
+    )
+
+
+class Suggestions:
+    """
+    People-you-may-know suggestions, computed offline from the connection
+    graph and stored per user in connection_suggestions:
+
+        {"_id": <user_id>, "computed_at": <datetime>, "stale": False,
+         "suggestions": [{"user_id": ..., "score": 7.5, "mutual": 3}, ...]}
+
+    Candidates are friends of friends ranked by mutual connections plus
+    shared department, batch and skills. Users without connections get
+    classmates (same department and batch) instead.
+    """
+
+    @staticmethod
+    def compute(full=False, now=None):
+        """
+        Recompute suggestions for users that have none, are marked stale or
+        are older than SUGGESTION_MAX_AGE (every user when full).
+
+        Args:
+            full: Recompute every user
+            now: Current time (defaults to now)
+
+        Returns:
+            dict: Number of users in the graph and users recomputed
+        """
+        now = now or datetime.utcnow()
+
+        users = list(users_collection.find({}, {"dept": 1, "batch": 1, "skills": 1}))
+        user_ids = [str(user["_id"]) for user in users]
+        position = {user_id: i for i, user_id in enumerate(user_ids)}
+        n = len(user_ids)
+
+        if full:
+            dirty = list(range(n))
+        else:
+            fresh = {
+                doc["_id"]
+                for doc in suggestions_collection.find(
+                    {
+                        "stale": {"$ne": True},
+                        "computed_at": {
+                            "$gte": now - timedelta(seconds=SUGGESTION_MAX_AGE)
+                        },
+                    },
+                    {"_id": 1},
+                )
+            }
+            dirty = [i for i, user_id in enumerate(user_ids) if user_id not in fresh]
+
+        if not dirty:
+            return {"users": n, "computed": 0}
+
+        # Symmetric adjacency in CSR form: the neighbors of node i are
+        # indices[indptr[i]:indptr[i + 1]]
+        sources, targets = [], []
+        for edge in connections_collection.find(
+            {"status": "accepted"}, {"user1_id": 1, "user2_id": 1}
+        ):
+            a = position.get(edge["user1_id"])
+            b = position.get(edge["user2_id"])
+            if a is not None and b is not None and a != b:
+                sources += [a, b]
+                targets += [b, a]
+
+        sources = np.array(sources, dtype=np.int64)
+        targets = np.array(targets, dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        indices = targets[order]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+
+        # Users with a pending request either way are not suggested
+        pending = {}
+        for request in connection_requests_collection.find(
+            {"status": "pending"}, {"from_user_id": 1, "to_user_id": 1}
+        ):
+            a = position.get(request["from_user_id"])
+            b = position.get(request["to_user_id"])
+            if a is not None and b is not None:
+                pending.setdefault(a, []).append(b)
+                pending.setdefault(b, []).append(a)
+
+        dept = _codes(users, "dept")
+        batch = _codes(users, "batch")
+        skills = [
+            {str(skill).strip().lower() for skill in user.get("skills") or []}
+            for user in users
+        ]
+
+        operations = []
+        computed = 0
+        for i in dirty:
+            neighbors = indices[indptr[i] : indptr[i + 1]]
+
+            if neighbors.size:
+                candidates, mutual = np.unique(
+                    _neighbors_of(indptr, indices, neighbors), return_counts=True
+                )
+            elif dept[i] >= 0 and batch[i] >= 0:
+                candidates = np.flatnonzero((dept == dept[i]) & (batch == batch[i]))
+                mutual = np.zeros(candidates.size, dtype=np.int64)
+            else:
+                # Without a department and batch there are no classmates
+                candidates = np.empty(0, dtype=np.int64)
+                mutual = np.empty(0, dtype=np.int64)
+
+            excluded = np.concatenate(
+                [neighbors, [i], np.array(pending.get(i, []), dtype=np.int64)]
+            )
+            keep = ~np.isin(candidates, excluded)
+            candidates, mutual = candidates[keep], mutual[keep]
+
+            scores = (
+                MUTUAL_WEIGHT * mutual
+                + DEPT_WEIGHT * ((dept[candidates] == dept[i]) & (dept[i] >= 0))
+                + BATCH_WEIGHT * ((batch[candidates] == batch[i]) & (batch[i] >= 0))
+            )
+
+            # Score skills only for the strongest candidates
+            if candidates.size > SUGGESTION_CANDIDATES:
+                top = np.argpartition(-scores, SUGGESTION_CANDIDATES)[
+                    :SUGGESTION_CANDIDATES
+                ]
+                candidates, mutual, scores = candidates[top], mutual[top], scores[top]
+
+            if skills[i]:
+                scores = scores + SKILLS_WEIGHT * np.array(
+                    [
+                        len(skills[i] & skills[c]) / len(skills[i] | skills[c])
+                        for c in candidates
+                    ]
+                )
+
+            best = np.argsort(-scores, kind="stable")[:SUGGESTION_LIMIT]
+            suggestions = [
+                {
+                    "user_id": user_ids[candidates[k]],
+                    "score": round(float(scores[k]), 3),
+                    "mutual": int(mutual[k]),
+                }
+                for k in best
+            ]
+
+            operations.append(
+                ReplaceOne(
+                    {"_id": user_ids[i]},
+                    {"suggestions": suggestions, "computed_at": now, "stale": False},
+                    upsert=True,
+                )
+            )
+            if len(operations) >= SUGGESTION_WRITE_BATCH:
+                suggestions_collection.bulk_write(operations, ordered=False)
+                computed += len(operations)
+                operations = []
+
+        if operations:
+            suggestions_collection.bulk_write(operations, ordered=False)
+            computed += len(operations)
+
+        return {"users": n, "computed": computed}
+
+    @staticmethod
+    def mark_stale(*user_ids):
+        """
+        Flag users' suggestions, and their connections' suggestions, for
+        the next run after an edge between them changed.
+
+        Args:
+            user_ids: IDs of the users whose edge changed
+        """
+        try:
+            affected = set(user_ids)
+            for user_id in user_ids:
+                affected.update(connection_graph.connection_ids(user_id))
+
+            suggestions_collection.update_many(
+                {"_id": {"$in": list(affected)}}, {"$set": {"stale": True}}
+            )
+        except Exception as e:
+            logger.warning(f"Error marking suggestions stale: {e}")
+
+    @staticmethod
+    def get_for_user(user_id, limit=10):
+        """
+        Get stored suggestions for a user, skipping anyone they have
+        connected with or sent or received a request from since the last
+        run.
+
+        Args:
+            user_id: User ID
+            limit: Maximum number of suggestions
+
+        Returns:
+            list: Suggested users with mutual connection counts
+        """
+        try:
+            doc = suggestions_collection.find_one({"_id": user_id})
+            if not doc:
+                return []
+
+            adjacency = connection_graph.adjacency(user_id)
+            suggestions = [
+                s
+                for s in doc["suggestions"]
+                if s["user_id"] not in adjacency.connected
+                and s["user_id"] not in adjacency.sent
+                and s["user_id"] not in adjacency.received
+            ][:limit]
+
+            users = user_summaries.get_many(s["user_id"] for s in suggestions)
+
+            result = []
+            for suggestion in suggestions:
+                user = users.get(suggestion["user_id"])
+                if user:
+                    result.append(
+                        {
+                            "user": {
+                                "_id": str(user["_id"]),
+                                "name": user.get("name", ""),
+                                "email": user.get("email", ""),
+                                "role": user.get("role", ""),
+                                "dept": user.get("dept", ""),
+                                "batch": user.get("batch", ""),
+                                "photo_url": user.get("photo_url", ""),
+                            },
+                            "mutual_connections": suggestion["mutual"],
+                            "score": suggestion["score"],
+                        }
+                    )
+
+            return result
+
+        except Exception as e:
+            logger.error(f"Error getting suggestions: {e}")
+            return []
@@ -1,10 +1,43 @@
-from app.models.base import feeds_collection, users_collection
+from app.models.base import (
+    feeds_collection,
+    timelines_collection,
+    users_collection,
+)
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from app.utils.cache import user_summaries
+from app.analytics.metrics import DailyMetrics
+from app.connections.graph import connection_graph
+from app.utils.helpers import decode_cursor, encode_cursor, keyset_filter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Default and maximum number of feeds returned per page
+FEED_PAGE_SIZE = 20
+FEED_PAGE_SIZE_MAX = 50
+
+# Number of post IDs kept in each materialized timeline
+TIMELINE_MAX_ENTRIES = 500
+
+# Authors with more connections than this are merged at read time instead
+# of being pushed into every connection's timeline
+FANOUT_ON_WRITE_MAX_CONNECTIONS = 500
+
+
+INDEXES = {
+    "feeds": [
+        IndexModel(
+            [("timestamp", DESCENDING), ("_id", DESCENDING)], name="timestamp_-1__id_-1"
+        ),
+        IndexModel(
+            [("author", ASCENDING), ("timestamp", DESCENDING)],
+            name="author_1_timestamp_-1",
+        ),
+    ],
+}
+
 
 class Feed:
     @staticmethod
@@ -27,6 +60,18 @@ class Feed:
             }
 
             result = feeds_collection.insert_one(feed_data)
+            DailyMetrics.record("post", user_email=author_email)
+
+            # Push the post into connections' timelines
+            try:
+                Timeline.fan_out(
+                    result.inserted_id, author_email, feed_data["timestamp"]
+                )
+            except Exception as fanout_error:
+                logger.warning(
+                    f"Timeline fan-out failed but feed was created: {fanout_error}"
+                )
+
             return str(result.inserted_id)
 
         except Exception as e:
@@ -42,40 +87,94 @@ class Feed:
             list: List of feeds
         """
         try:
-            feeds = feeds_collection.find().sort("timestamp", -1)
-
-            feed_list = []
-            for feed in feeds:
-                # Get author details
-                author = users_collection.find_one({"email": feed["author"]})
-
-                if author:
-                    author_data = {
-                        "email": author["email"],
-                        "name": author["name"],
-                    }
-                else:
-                    # If author not found, provide default values
-                    author_data = {
-                        "email": "unknown@example.com",
-                        "name": "Unknown User",
-                    }
-
-                feed_data = {
-                    "_id": str(feed["_id"]),
-                    "content": feed["content"],
-                    "author": author_data,
-                    "timestamp": feed["timestamp"].isoformat(),
-                }
-
-                feed_list.append(feed_data)
-
-            return feed_list
+            feeds = list(feeds_collection.find().sort("timestamp", -1))
+            authors = Feed._get_authors(feed["author"] for feed in feeds)
+
+            return [Feed._serialize(feed, authors) for feed in feeds]
 
         except Exception as e:
             logger.error(f"Error getting feeds: {e}")
             return []
 
+    @staticmethod
+    def get_page(cursor=None, limit=FEED_PAGE_SIZE):
+        """
+        Get one page of feeds, newest first, using keyset pagination.
+
+        Args:
+            cursor: Cursor returned as next_cursor by the previous page
+            limit: Number of feeds per page (capped at FEED_PAGE_SIZE_MAX)
+
+        Returns:
+            dict: Feeds on this page and the cursor for the next one
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(int(limit), FEED_PAGE_SIZE_MAX))
+
+        query = {}
+        if cursor:
+            query = keyset_filter("timestamp", decode_cursor(cursor))
+
+        try:
+            # Fetch one extra row to know whether another page exists
+            feeds = list(
+                feeds_collection.find(query)
+                .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+                .limit(limit + 1)
+            )
+
+            has_more = len(feeds) > limit
+            feeds = feeds[:limit]
+            authors = Feed._get_authors(feed["author"] for feed in feeds)
+
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_cursor(feeds[-1]["timestamp"], feeds[-1]["_id"])
+
+            return {
+                "feeds": [Feed._serialize(feed, authors) for feed in feeds],
+                "next_cursor": next_cursor,
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting feed page: {e}")
+            return {"feeds": [], "next_cursor": None}
+
+    @staticmethod
+    def _get_authors(emails):
+        """
+        Fetch author details for a set of emails from the user summary cache.
+
+        Args:
+            emails: Iterable of author emails
+
+        Returns:
+            dict: Author data keyed by email
+        """
+        authors = user_summaries.get_many_by_email(emails)
+        return {
+            email: {"email": author["email"], "name": author["name"]}
+            for email, author in authors.items()
+        }
+
+    @staticmethod
+    def _serialize(feed, authors):
+        """Format a feed document with its author details."""
+        # If author not found, provide default values
+        author_data = authors.get(
+            feed["author"],
+            {"email": "unknown@example.com", "name": "Unknown User"},
+        )
+
+        return {
+            "_id": str(feed["_id"]),
+            "content": feed["content"],
+            "author": author_data,
+            "timestamp": feed["timestamp"].isoformat(),
+        }
+
     @staticmethod
     def get_by_id(feed_id):
         """
@@ -113,3 +212,243 @@ class Feed:
         except Exception as e:
             logger.error(f"Error deleting feed: {e}")
             return False
+
+
+class Timeline:
+    """
+    Per-user home timelines built from accepted connections.
+
+    Each timeline document is keyed by user ID and holds the newest post IDs
+    from the user's connections (fan-out on write). Posts by authors with
+    too many connections to fan out are instead pulled at read time from the
+    "celebrities" list stored on the reader's timeline.
+    """
+
+    @staticmethod
+    def fan_out(feed_id, author_email, timestamp):
+        """
+        Push a new post into the timelines of the author and their connections.
+
+        Args:
+            feed_id: ObjectId of the new feed
+            author_email: Email of the author
+            timestamp: Feed timestamp
+        """
+        author = users_collection.find_one(
+            {"email": author_email}, {"_id": 1, "timeline_fanout_on_read": 1}
+        )
+        if not author:
+            return
+
+        author_id = str(author["_id"])
+        connection_ids = Timeline._get_connection_ids(author_id)
+
+        if len(connection_ids) > FANOUT_ON_WRITE_MAX_CONNECTIONS:
+            if not author.get("timeline_fanout_on_read"):
+                Timeline._switch_to_fanout_on_read(
+                    author["_id"], author_email, connection_ids
+                )
+            recipients = [author_id]
+        else:
+            recipients = [author_id] + connection_ids
+
+        entry = {"feed_id": feed_id, "timestamp": timestamp}
+        operations = [
+            UpdateOne(
+                {"_id": user_id},
+                {
+                    "$push": {
+                        "entries": {
+                            "$each": [entry],
+                            "$sort": {"timestamp": -1},
+                            "$slice": TIMELINE_MAX_ENTRIES,
+                        }
+                    },
+                    "$set": {"updated_at": datetime.utcnow()},
+                },
+                upsert=True,
+            )
+            for user_id in recipients
+        ]
+        timelines_collection.bulk_write(operations, ordered=False)
+
+    @staticmethod
+    def on_connected(user1_id, user2_id):
+        """
+        Link two newly connected users' timelines to each other's
+        fan-out-on-read posts.
+
+        Args:
+            user1_id: First user ID
+            user2_id: Second user ID
+        """
+        celebrities = users_collection.find(
+            {
+                "_id": {"$in": [ObjectId(user1_id), ObjectId(user2_id)]},
+                "timeline_fanout_on_read": True,
+            },
+            {"email": 1},
+        )
+
+        for celebrity in celebrities:
+            reader_id = user2_id if str(celebrity["_id"]) == user1_id else user1_id
+            timelines_collection.update_one(
+                {"_id": reader_id},
+                {"$addToSet": {"celebrities": celebrity["email"]}},
+            )
+
+    @staticmethod
+    def on_disconnected(user1_id, user2_id):
+        """
+        Unlink two users' timelines from each other's fan-out-on-read posts
+        after their connection is removed.
+
+        Args:
+            user1_id: First user ID
+            user2_id: Second user ID
+        """
+        users = users_collection.find(
+            {"_id": {"$in": [ObjectId(user1_id), ObjectId(user2_id)]}},
+            {"email": 1},
+        )
+
+        for user in users:
+            reader_id = user2_id if str(user["_id"]) == user1_id else user1_id
+            timelines_collection.update_one(
+                {"_id": reader_id}, {"$pull": {"celebrities": user["email"]}}
+            )
+
+    @staticmethod
+    def get_for_user(user_email, cursor=None, limit=FEED_PAGE_SIZE):
+        """
+        Get one page of a user's home timeline, newest first.
+
+        Args:
+            user_email: Email of the reader
+            cursor: Cursor returned as next_cursor by the previous page
+            limit: Number of feeds per page (capped at FEED_PAGE_SIZE_MAX)
+
+        Returns:
+            dict: Feeds on this page and the cursor for the next one
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(int(limit), FEED_PAGE_SIZE_MAX))
+        position = decode_cursor(cursor) if cursor else None
+
+        try:
+            user = users_collection.find_one({"email": user_email}, {"_id": 1})
+            if not user:
+                return {"feeds": [], "next_cursor": None}
+
+            user_id = str(user["_id"])
+            timeline = timelines_collection.find_one({"_id": user_id})
+            if timeline is None or "built_at" not in timeline:
+                timeline = Timeline.rebuild(user_id)
+
+            candidates = [
+                (entry["timestamp"], entry["feed_id"])
+                for entry in timeline.get("entries", [])
+            ]
+
+            # Merge in posts from authors that are not fanned out on write
+            if timeline.get("celebrities"):
+                query = {"author": {"$in": timeline["celebrities"]}}
+                if position:
+                    query.update(keyset_filter("timestamp", position))
+                candidates.extend(
+                    (feed["timestamp"], feed["_id"])
+                    for feed in feeds_collection.find(query, {"timestamp": 1})
+                    .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+                    .limit(limit + 1)
+                )
+
+            if position:
+                candidates = [c for c in candidates if c < position]
+            candidates = sorted(set(candidates), reverse=True)[: limit + 1]
+
+            has_more = len(candidates) > limit
+            candidates = candidates[:limit]
+
+            feed_ids = [feed_id for _, feed_id in candidates]
+            feeds = {
+                feed["_id"]: feed
+                for feed in feeds_collection.find({"_id": {"$in": feed_ids}})
+            }
+            # Deleted posts are skipped rather than pulled from every timeline
+            page = [feeds[feed_id] for feed_id in feed_ids if feed_id in feeds]
+            authors = Feed._get_authors(feed["author"] for feed in page)
+
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_cursor(*candidates[-1])
+
+            return {
+                "feeds": [Feed._serialize(feed, authors) for feed in page],
+                "next_cursor": next_cursor,
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting timeline: {e}")
+            return {"feeds": [], "next_cursor": None}
+
+    @staticmethod
+    def rebuild(user_id):
+        """
+        Build a user's timeline from their connections' recent posts.
+
+        Used the first time a timeline is read, so existing users start with
+        a populated feed.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            dict: The stored timeline document
+        """
+        connection_ids = Timeline._get_connection_ids(user_id)
+        authors = list(
+            users_collection.find(
+                {"_id": {"$in": [ObjectId(uid) for uid in [user_id] + connection_ids]}},
+                {"email": 1, "timeline_fanout_on_read": 1},
+            )
+        )
+
+        celebrities = [a["email"] for a in authors if a.get("timeline_fanout_on_read")]
+        pushed = [a["email"] for a in authors if not a.get("timeline_fanout_on_read")]
+
+        entries = [
+            {"feed_id": feed["_id"], "timestamp": feed["timestamp"]}
+            for feed in feeds_collection.find(
+                {"author": {"$in": pushed}}, {"timestamp": 1}
+            )
+            .sort("timestamp", DESCENDING)
+            .limit(TIMELINE_MAX_ENTRIES)
+        ]
+
+        timeline = {
+            "_id": user_id,
+            "entries": entries,
+            "celebrities": celebrities,
+            "built_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+        timelines_collection.replace_one({"_id": user_id}, timeline, upsert=True)
+        return timeline
+
+    @staticmethod
+    def _get_connection_ids(user_id):
+        """Get the IDs of a user's accepted connections."""
+        return connection_graph.connection_ids(user_id)
+
+    @staticmethod
+    def _switch_to_fanout_on_read(author_id, author_email, connection_ids):
+        """Mark an author as fan-out-on-read and register them with readers."""
+        users_collection.update_one(
+            {"_id": author_id}, {"$set": {"timeline_fanout_on_read": True}}
+        )
+        timelines_collection.update_many(
+            {"_id": {"$in": connection_ids}},
+            {"$addToSet": {"celebrities": author_email}},
+        )
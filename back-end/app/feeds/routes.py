@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.feeds.models import Feed
+from app.feeds.models import Feed, Timeline, FEED_PAGE_SIZE
 from app.auth.models import User
 
 feeds_bp = Blueprint("feeds", __name__)
@@ -12,6 +12,17 @@ def handle_feeds():
     current_user = get_jwt_identity()
 
     if request.method == "GET":
+        cursor = request.args.get("cursor")
+        limit = request.args.get("limit")
+
+        # Paginated mode when the client asks for it, full list otherwise
+        if cursor or limit:
+            try:
+                page = Feed.get_page(cursor, int(limit or FEED_PAGE_SIZE))
+            except ValueError:
+                return jsonify({"message": "Invalid cursor or limit"}), 400
+            return jsonify(page), 200
+
         feeds = Feed.get_all()
         return jsonify(feeds), 200
 
@@ -30,6 +41,23 @@ def handle_feeds():
             return jsonify({"message": str(e)}), 400
 
 
+@feeds_bp.route("/timeline", methods=["GET"])
+@jwt_required()
+def get_timeline():
+    current_user = get_jwt_identity()
+
+    try:
+        page = Timeline.get_for_user(
+            current_user,
+            request.args.get("cursor"),
+            int(request.args.get("limit", FEED_PAGE_SIZE)),
+        )
+    except ValueError:
+        return jsonify({"message": "Invalid cursor or limit"}), 400
+
+    return jsonify(page), 200
+
+
 @feeds_bp.route("/<id>", methods=["DELETE"])
 @jwt_required()
 def delete_feed(id):
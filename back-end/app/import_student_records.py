@@ -1,60 +1,212 @@
 import pandas as pd
-from pymongo import MongoClient
+from openpyxl import load_workbook
+from pymongo import MongoClient, UpdateOne
+from datetime import datetime
+import argparse
+import time
 import sys
 import os
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import STUDENT_DATA_FILE
+from app.auth.models import INDEXES
 
+CHUNK_SIZE = 5000
+RECORD_FIELDS = ["name", "regno", "dept", "batch", "is_alumni"]
+STAGING_COLLECTION = "student_records_import"
+# Bumped after every import so running workers reload their registry index
+VERSION_ID = "version"
 
-def import_excel_to_mongodb(excel_file=STUDENT_DATA_FILE):
+TRUE_VALUES = {"true", "yes", "y", "1", "1.0"}
+
+
+def read_chunks(data_file, chunk_size=CHUNK_SIZE):
+    """
+    Yield the registry as DataFrames of at most chunk_size rows.
+
+    CSV files are read with pandas' chunked reader; Excel files are read
+    row by row in openpyxl read-only mode, so neither loads the whole
+    file into memory.
+
+    Args:
+        data_file: Path to a .csv or .xlsx file
+        chunk_size: Rows per chunk
+
+    Yields:
+        DataFrame: Raw rows with the file's header as columns
+    """
+    if data_file.lower().endswith(".csv"):
+        yield from pd.read_csv(data_file, chunksize=chunk_size, dtype=str)
+        return
+
+    workbook = load_workbook(data_file, read_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(column).strip() for column in next(rows, ())]
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
+
+
+def clean_chunk(df):
+    """
+    Clean a chunk of raw rows with column-wise operations.
+
+    Rows without a regno or with a non-numeric batch are invalid. A regno
+    repeated within the chunk keeps its last row.
+
+    Args:
+        df: Raw rows
+
+    Returns:
+        tuple: (list of clean record dicts, number of invalid rows)
+    """
+    df = df.rename(columns=lambda column: str(column).strip().lower())
+    for field in RECORD_FIELDS:
+        if field not in df:
+            df[field] = None
+
+    regno = df["regno"].astype("string").str.strip().str.upper()
+    batch = pd.to_numeric(df["batch"], errors="coerce")
+
+    valid = regno.notna() & (regno != "") & batch.notna()
+    invalid = int((~valid).sum())
+
+    clean = pd.DataFrame(
+        {
+            "name": df["name"].fillna("").astype(str).str.strip(),
+            "regno": regno,
+            "dept": df["dept"].fillna("").astype(str).str.strip(),
+            "batch": batch,
+            "is_alumni": df["is_alumni"]
+            .astype("string")
+            .str.strip()
+            .str.lower()
+            .isin(TRUE_VALUES),
+        }
+    )[valid]
+
+    clean = clean.drop_duplicates(subset="regno", keep="last")
+
+    records = [
+        {
+            "name": name,
+            "regno": regno,
+            "dept": dept,
+            "batch": int(batch),
+            "is_alumni": bool(is_alumni),
+        }
+        for name, regno, dept, batch, is_alumni in clean.itertuples(
+            index=False, name=None
+        )
+    ]
+    return records, invalid
+
+
+def upsert_records(collection, records):
+    """
+    Upsert records by regno with one unordered bulk write.
+
+    Args:
+        collection: Target collection
+        records: Clean record dicts
+
+    Returns:
+        int: Number of records inserted or updated
+    """
+    if not records:
+        return 0
+
+    result = collection.bulk_write(
+        [
+            UpdateOne({"regno": record["regno"]}, {"$set": record}, upsert=True)
+            for record in records
+        ],
+        ordered=False,
+    )
+    return result.upserted_count + result.matched_count
+
+
+def import_excel_to_mongodb(
+    excel_file=STUDENT_DATA_FILE, chunk_size=CHUNK_SIZE, replace=False
+):
+    """
+    Import the student registry without taking student_records offline.
+
+    By default records are upserted into the live collection, so signups
+    keep verifying throughout and records missing from the file are kept.
+    With replace, the file is loaded into a staging collection that is
+    then renamed over student_records in one atomic step, dropping
+    records that are no longer in the file.
+
+    Args:
+        excel_file: Path to a .xlsx or .csv registry
+        chunk_size: Rows read and written per batch
+        replace: Replace the collection instead of upserting into it
+    """
     try:
         # Verify file exists
         if not os.path.exists(excel_file):
             print(f"Error: Student data file not found at {excel_file}")
             sys.exit(1)
 
-        # Read the Excel file
-        print(f"Reading data from {excel_file}")
-        df = pd.read_excel(excel_file)
-
-        # Clean the DataFrame - remove rows with empty regno
-        df = df.dropna(subset=["regno"])
-
         # Connect to MongoDB
         client = MongoClient("mongodb://localhost:27017/")
         db = client["imperious"]
-        student_records_collection = db["student_records"]
 
-        # Drop existing collection to avoid duplicates
-        student_records_collection.drop()
-
-        # Process each record
-        processed_records = []
-        for _, record in df.iterrows():
-            # Clean and format the data
-            regno = str(record.get("regno", "")).strip()
-            if regno:  # Only process records with valid regno
-                processed_record = {
-                    "name": str(record.get("name", "")).strip(),
-                    "regno": regno.upper(),  # Standardize registration numbers
-                    "dept": str(record.get("dept", "")).strip(),
-                    "batch": int(record.get("batch", 0)),
-                    "is_alumni": bool(record.get("is_alumni", False)),
-                }
-                processed_records.append(processed_record)
-
-        if not processed_records:
-            print("No valid records found in Excel file")
+        if replace:
+            db.drop_collection(STAGING_COLLECTION)
+            target = db[STAGING_COLLECTION]
+        else:
+            target = db["student_records"]
+
+        # Upserts look records up by regno, so the indexes must exist first.
+        # A staging collection needs every declared index too, since the
+        # rename replaces student_records together with its indexes
+        target.create_indexes(INDEXES["student_records"])
+
+        print(f"Reading data from {excel_file}")
+        start = time.perf_counter()
+        rows_read = imported = invalid = 0
+
+        for chunk in read_chunks(excel_file, chunk_size):
+            records, chunk_invalid = clean_chunk(chunk)
+            imported += upsert_records(target, records)
+            rows_read += len(chunk)
+            invalid += chunk_invalid
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {rows_read} rows read, {imported} imported, {invalid} invalid "
+                f"({rows_read / elapsed:.0f} rows/s)"
+            )
+
+        if not imported:
+            print("No valid records found in student data file")
+            if replace:
+                db.drop_collection(STAGING_COLLECTION)
             return
 
-        # Create an index on regno for faster lookups
-        student_records_collection.create_index("regno", unique=True)
+        if replace:
+            target.rename("student_records", dropTarget=True)
+            print("Replaced student_records with the imported records")
 
-        # Insert the records
-        result = student_records_collection.insert_many(processed_records)
-        print(f"Successfully imported {len(result.inserted_ids)} records")
+        elapsed = time.perf_counter() - start
+        print(
+            f"Successfully imported {imported} records from {rows_read} rows "
+            f"in {elapsed:.1f}s ({rows_read / elapsed:.0f} rows/s); "
+            f"skipped {invalid} invalid rows"
+        )
 
         # Verify the sample student exists
         sample_student = {
@@ -65,6 +217,8 @@ def import_excel_to_mongodb(excel_file=STUDENT_DATA_FILE):
             "is_alumni": False,
         }
 
+        student_records_collection = db["student_records"]
+
         # Check if sample student already exists
         existing_student = student_records_collection.find_one(
             {"regno": sample_student["regno"]}
@@ -73,16 +227,34 @@ def import_excel_to_mongodb(excel_file=STUDENT_DATA_FILE):
             student_records_collection.insert_one(sample_student)
             print("Added sample student record")
 
+        # Bump after the last write so workers reload a complete registry
+        db["student_records_meta"].update_one(
+            {"_id": VERSION_ID},
+            {"$inc": {"version": 1}, "$set": {"imported_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
     except Exception as e:
         print(f"Error importing data: {str(e)}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    # If file path is provided as argument, use that instead of default
-    if len(sys.argv) > 1:
-        excel_file = sys.argv[1]
-        import_excel_to_mongodb(excel_file)
-    else:
-        # Use default file path
-        import_excel_to_mongodb()
+    parser = argparse.ArgumentParser(description="Import student records")
+    parser.add_argument(
+        "excel_file",
+        nargs="?",
+        default=STUDENT_DATA_FILE,
+        help="Registry file (.xlsx or .csv); defaults to STUDENT_DATA_FILE",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per batch"
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Atomically replace the collection instead of upserting into it",
+    )
+    args = parser.parse_args()
+
+    import_excel_to_mongodb(args.excel_file, args.chunk_size, args.replace)
@@ -1,10 +1,38 @@
-from app.models.base import jobs_collection, users_collection
+from app.models.base import jobs_collection
 from bson import ObjectId
 from datetime import datetime
+from pymongo import DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from app.utils.cache import user_summaries
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+INDEXES = {
+    "jobs": [
+        IndexModel([("created_at", DESCENDING)], name="created_at_-1"),
+        IndexModel(
+            [
+                ("title", TEXT),
+                ("company", TEXT),
+                ("requirements", TEXT),
+                ("location", TEXT),
+                ("description", TEXT),
+            ],
+            name="jobs_text",
+            weights={
+                "title": 10,
+                "company": 5,
+                "requirements": 3,
+                "location": 3,
+                "description": 1,
+            },
+            default_language="english",
+        ),
+    ],
+}
+
 
 class Job:
     @staticmethod
@@ -48,19 +76,22 @@ class Job:
         search_term=None,
         location=None,
         job_type=None,
-        sort_by="created_at",
+        sort_by=None,
         sort_order=-1,
     ):
         """
         Get all jobs with filtering and pagination.
 
+        Searches use the weighted jobs_text index and, unless another sort
+        field is given, rank results by relevance.
+
         Args:
             page: Page number
             limit: Number of items per page
             search_term: Text to search for
             location: Location filter
             job_type: Job type filter
-            sort_by: Field to sort by
+            sort_by: Field to sort by, or "relevance" when searching
             sort_order: Sort order (1 for ascending, -1 for descending)
 
         Returns:
@@ -75,17 +106,11 @@ class Job:
 
             # Add search filter
             if search_term:
-                query["$or"] = [
-                    {"title": {"$regex": search_term, "$options": "i"}},
-                    {"company": {"$regex": search_term, "$options": "i"}},
-                    {"description": {"$regex": search_term, "$options": "i"}},
-                    {"requirements": {"$regex": search_term, "$options": "i"}},
-                    {"location": {"$regex": search_term, "$options": "i"}},
-                ]
+                query["$text"] = {"$search": search_term}
 
             # Add location filter
             if location:
-                query["location"] = {"$regex": location, "$options": "i"}
+                query["location"] = {"$regex": re.escape(location), "$options": "i"}
 
             # Add job type filter
             if job_type:
@@ -105,16 +130,25 @@ class Job:
             # Convert sort_order to integer
             sort_order = int(sort_order) if sort_order in ["1", "-1"] else -1
 
-            # Count total documents
-            total = jobs_collection.count_documents(query)
-
-            # Get jobs
-            jobs = list(
-                jobs_collection.find(query)
-                .sort(sort_field, sort_order)
-                .skip(skip)
-                .limit(limit)
-            )
+            sort = [(sort_field, sort_order)]
+            projection = None
+            if search_term:
+                projection = {"score": {"$meta": "textScore"}}
+                if sort_by in (None, "relevance"):
+                    sort = [("score", {"$meta": "textScore"}), ("created_at", -1)]
+
+            try:
+                total, jobs = Job._find_page(query, projection, sort, skip, limit)
+            except OperationFailure as e:
+                if not search_term:
+                    raise
+                # The text index has not been created yet
+                logger.warning(f"Text search unavailable, using regex: {e}")
+                query.pop("$text")
+                query["$or"] = Job._regex_search_clause(search_term)
+                total, jobs = Job._find_page(
+                    query, None, [(sort_field, sort_order)], skip, limit
+                )
 
             # Process jobs
             for job in jobs:
@@ -138,6 +172,24 @@ class Job:
             logger.error(f"Error getting jobs: {str(e)}")
             return {"jobs": [], "total": 0, "page": page, "pages": 0}
 
+    @staticmethod
+    def _find_page(query, projection, sort, skip, limit):
+        """Count matching jobs and fetch one sorted page of them."""
+        total = jobs_collection.count_documents(query)
+        jobs = list(
+            jobs_collection.find(query, projection).sort(sort).skip(skip).limit(limit)
+        )
+        return total, jobs
+
+    @staticmethod
+    def _regex_search_clause(search_term):
+        """Build the unindexed regex search used when text search fails."""
+        pattern = {"$regex": re.escape(search_term), "$options": "i"}
+        return [
+            {field: pattern}
+            for field in ["title", "company", "description", "requirements", "location"]
+        ]
+
     @staticmethod
     def get_by_id(job_id):
         """
@@ -157,7 +209,7 @@ class Job:
                 job["_id"] = str(job["_id"])
 
                 # Fetch author details
-                author = users_collection.find_one({"_id": ObjectId(job["posted_by"])})
+                author = user_summaries.get(job["posted_by"])
                 if author:
                     job["author"] = {
                         "name": author["name"],
@@ -17,7 +17,7 @@ def handle_jobs():
         search_term = request.args.get("search", None)
         location = request.args.get("location", None)
         job_type = request.args.get("job_type", None)
-        sort_by = request.args.get("sort_by", "created_at")
+        sort_by = request.args.get("sort_by")
         sort_order = request.args.get("sort_order", "-1")
 
         # Get jobs
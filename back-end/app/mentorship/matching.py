@@ -0,0 +1,293 @@
+from app.models.base import (
+    mentor_queues_collection,
+    mentorship_requests,
+    projects_collection,
+    users_collection,
+)
+from app.mentorship.models import _hydrate_requests, open_requests_query
+from app.utils.search import tokenize
+from bson import ObjectId
+from collections import Counter
+from datetime import datetime
+from pymongo import ReplaceOne
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Accepted requests a mentor can hold before their queue is emptied
+MENTOR_LOAD_CAP = 5
+# Ranked requests stored per mentor
+MENTOR_QUEUE_SIZE = 100
+MENTOR_QUEUE_PAGE_SIZE = 20
+MENTOR_QUEUE_PAGE_SIZE_MAX = 50
+# Mentors scored against every request at once, bounding the score matrix
+MENTOR_SCORE_BLOCK = 256
+# Added to the skill similarity (0-1) when mentor and student share a
+# department
+DEPT_BONUS = 0.25
+MENTORING_WILLINGNESS = "mentoring"
+
+
+def _tfidf(documents, vocabulary):
+    """
+    Build L2-normalized TF-IDF rows for token lists over a vocabulary.
+
+    Args:
+        documents: List of token lists
+        vocabulary: Dict of token to column
+
+    Returns:
+        ndarray: Matrix of shape (len(documents), len(vocabulary))
+    """
+    matrix = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+    for row, tokens in enumerate(documents):
+        for token, count in Counter(tokens).items():
+            column = vocabulary.get(token)
+            if column is not None:
+                matrix[row, column] = count
+
+    # Smoothed inverse document frequency, as in scikit-learn
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+    matrix *= idf
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class MentorMatcher:
+    """
+    Precomputed per-mentor queues of open mentorship requests, stored in
+    mentor_queues:
+
+        {"_id": <mentor_id>, "computed_at": <datetime>, "load": 2,
+         "at_capacity": False, "total": 37,
+         "requests": [{"request_id": ..., "score": 0.83}, ...]}
+
+    Requests are ranked by cosine similarity between the TF-IDF vectors of
+    the project's tech stack and title and the mentor's skills, plus
+    DEPT_BONUS for a shared department. Only alumni willing to mentor get
+    a queue, and it is empty once they hold MENTOR_LOAD_CAP mentees.
+    """
+
+    @staticmethod
+    def compute(now=None):
+        """
+        Rebuild every mentor's queue.
+
+        Args:
+            now: Current time (defaults to now)
+
+        Returns:
+            dict: Numbers of mentors, open requests and full mentors
+        """
+        now = now or datetime.utcnow()
+
+        mentors = list(
+            users_collection.find(
+                {"role": "alumni", "willingness": MENTORING_WILLINGNESS},
+                {"email": 1, "dept": 1, "skills": 1},
+            )
+        )
+        requests = list(
+            mentorship_requests.find(
+                open_requests_query(),
+                {"project_id": 1, "student_id": 1, "ignored_by": 1},
+            )
+        )
+
+        # Current mentees per mentor, in one aggregation
+        load = {
+            row["_id"]: row["count"]
+            for row in mentorship_requests.aggregate(
+                [
+                    {
+                        "$match": {
+                            "status": "accepted",
+                            "mentor_id": {"$in": [m["_id"] for m in mentors]},
+                        }
+                    },
+                    {"$group": {"_id": "$mentor_id", "count": {"$sum": 1}}},
+                ]
+            )
+        }
+
+        projects = {
+            project["_id"]: project
+            for project in projects_collection.find(
+                {"_id": {"$in": [r["project_id"] for r in requests]}},
+                {"title": 1, "tech_stack": 1},
+            )
+        }
+        students = {
+            student["_id"]: student.get("dept")
+            for student in users_collection.find(
+                {"_id": {"$in": [r["student_id"] for r in requests]}}, {"dept": 1}
+            )
+        }
+
+        request_tokens = []
+        for request in requests:
+            project = projects.get(request["project_id"], {})
+            tokens = []
+            for technology in project.get("tech_stack") or []:
+                tokens += tokenize(technology)
+            request_tokens.append(tokens + tokenize(project.get("title")))
+
+        mentor_tokens = [
+            [
+                token
+                for skill in mentor.get("skills") or []
+                for token in tokenize(str(skill))
+            ]
+            for mentor in mentors
+        ]
+
+        vocabulary = {}
+        for tokens in request_tokens + mentor_tokens:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+
+        request_vectors = _tfidf(request_tokens, vocabulary)
+        mentor_vectors = _tfidf(mentor_tokens, vocabulary)
+
+        request_depts = np.array(
+            [students.get(r["student_id"]) or "" for r in requests], dtype=object
+        )
+        ignored = [set(r.get("ignored_by") or []) for r in requests]
+
+        operations = []
+        full = 0
+        for start in range(0, len(mentors), MENTOR_SCORE_BLOCK):
+            block = mentors[start : start + MENTOR_SCORE_BLOCK]
+            scores = mentor_vectors[start : start + len(block)] @ request_vectors.T
+
+            for row, mentor in enumerate(block):
+                mentee_count = load.get(mentor["_id"], 0)
+                at_capacity = mentee_count >= MENTOR_LOAD_CAP
+                queue = []
+
+                if not at_capacity and requests:
+                    mentor_scores = scores[row].astype(np.float64)
+                    if mentor.get("dept"):
+                        mentor_scores += DEPT_BONUS * (request_depts == mentor["dept"])
+
+                    for index in np.argsort(-mentor_scores, kind="stable"):
+                        if mentor.get("email") in ignored[index]:
+                            continue
+                        queue.append(
+                            {
+                                "request_id": str(requests[index]["_id"]),
+                                "score": round(float(mentor_scores[index]), 4),
+                            }
+                        )
+                        if len(queue) == MENTOR_QUEUE_SIZE:
+                            break
+                else:
+                    full += at_capacity
+
+                operations.append(
+                    ReplaceOne(
+                        {"_id": str(mentor["_id"])},
+                        {
+                            "requests": queue,
+                            "total": len(queue),
+                            "load": mentee_count,
+                            "at_capacity": at_capacity,
+                            "computed_at": now,
+                        },
+                        upsert=True,
+                    )
+                )
+
+        if operations:
+            mentor_queues_collection.bulk_write(operations, ordered=False)
+
+        # Drop queues of alumni who stopped mentoring
+        mentor_queues_collection.delete_many(
+            {"_id": {"$nin": [str(m["_id"]) for m in mentors]}}
+        )
+
+        return {"mentors": len(mentors), "requests": len(requests), "full": full}
+
+    @staticmethod
+    def get_queue(mentor_id, mentor_email, page=1, per_page=MENTOR_QUEUE_PAGE_SIZE):
+        """
+        Get a page of a mentor's ranked queue. Requests taken by another
+        mentor or ignored since the queue was computed are skipped, and the
+        mentor's load is re-counted so one who reached MENTOR_LOAD_CAP
+        since then gets an empty page.
+
+        Args:
+            mentor_id: Mentor ID
+            mentor_email: Mentor email
+            page: Page number
+            per_page: Requests per page (capped at MENTOR_QUEUE_PAGE_SIZE_MAX)
+
+        Returns:
+            dict: Requests with their match score plus paging, load and
+                  computed_at
+        """
+        page = max(1, int(page))
+        per_page = max(1, min(int(per_page), MENTOR_QUEUE_PAGE_SIZE_MAX))
+        skip = (page - 1) * per_page
+
+        result = {
+            "requests": [],
+            "page": page,
+            "per_page": per_page,
+            "total": 0,
+            "load": 0,
+            "at_capacity": False,
+            "computed_at": None,
+        }
+
+        try:
+            queue = mentor_queues_collection.find_one(
+                {"_id": str(mentor_id)},
+                {
+                    "requests": {"$slice": [skip, per_page]},
+                    "total": 1,
+                    "computed_at": 1,
+                },
+            )
+            if not queue:
+                return result
+
+            # Accepting a request does not touch the stored queue, so the
+            # cap is checked against the live count
+            load = mentorship_requests.count_documents(
+                {"mentor_id": ObjectId(mentor_id), "status": "accepted"}
+            )
+            result.update(
+                load=load,
+                at_capacity=load >= MENTOR_LOAD_CAP,
+                computed_at=queue["computed_at"].isoformat(),
+            )
+            if result["at_capacity"]:
+                return result
+
+            entries = queue.get("requests", [])
+            scores = {entry["request_id"]: entry["score"] for entry in entries}
+
+            query = open_requests_query(mentor_email)
+            query["_id"] = {"$in": [ObjectId(rid) for rid in scores]}
+            requests = {
+                str(request["_id"]): request
+                for request in mentorship_requests.find(query)
+            }
+
+            # Keep the queue's ranking
+            ranked = [requests[rid] for rid in scores if rid in requests]
+            for request in _hydrate_requests(ranked):
+                request["match_score"] = scores[request["_id"]]
+                result["requests"].append(request)
+
+            result["total"] = queue.get("total", 0)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error getting mentor queue: {e}")
+            return result
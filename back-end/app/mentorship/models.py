@@ -1,10 +1,109 @@
 from app.models.base import mentorship_requests, users_collection, projects_collection
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from app.utils.cache import user_summaries
 import logging
 
 logger = logging.getLogger(__name__)
 
+INDEXES = {
+    "mentorship_requests": [
+        IndexModel([("student_id", ASCENDING)], name="student_id_1"),
+        IndexModel(
+            [("mentor_id", ASCENDING), ("status", ASCENDING)],
+            name="mentor_id_1_status_1",
+        ),
+        # Open requests (pending, no mentor yet), newest first
+        IndexModel(
+            [
+                ("status", ASCENDING),
+                ("mentor_id", ASCENDING),
+                ("created_at", DESCENDING),
+            ],
+            name="status_1_mentor_id_1_created_at_-1",
+        ),
+    ],
+}
+
+
+def open_requests_query(mentor_email=None):
+    """
+    Filter for requests still looking for a mentor, excluding those the
+    mentor has ignored.
+    """
+    query = {"status": "pending", "mentor_id": None}
+    if mentor_email:
+        query["ignored_by"] = {"$ne": mentor_email}
+    return query
+
+
+def _hydrate_requests(requests):
+    """
+    Attach project, owner and student details to mentorship requests with
+    one project query and one batched user lookup, and make them JSON
+    serializable.
+
+    Args:
+        requests: Request documents
+
+    Returns:
+        list: The same requests, formatted for mentors
+    """
+    projects = {
+        project["_id"]: project
+        for project in projects_collection.find(
+            {"_id": {"$in": [request["project_id"] for request in requests]}},
+            {"title": 1, "abstract": 1, "created_by": 1},
+        )
+    }
+    users = user_summaries.get_many(
+        [request["student_id"] for request in requests]
+        + [project["created_by"] for project in projects.values()]
+    )
+
+    # Process requests
+    for request in requests:
+        # Get project details
+        project = projects.get(request["project_id"])
+
+        if project:
+            request["project"] = {
+                "_id": str(project["_id"]),
+                "title": project["title"],
+                "abstract": project["abstract"],
+                "created_by": str(project["created_by"]),
+            }
+
+            # Get project owner details
+            owner = users.get(str(project["created_by"]))
+            if owner:
+                request["project"]["owner_name"] = owner.get("name")
+                request["project"]["owner_dept"] = owner.get("dept")
+
+        # Get student details
+        student = users.get(str(request["student_id"]))
+        if student:
+            request["student"] = {
+                "_id": str(student["_id"]),
+                "name": student["name"],
+                "dept": student["dept"],
+            }
+
+        # Convert ObjectIds to strings
+        request["_id"] = str(request["_id"])
+        request["student_id"] = str(request["student_id"])
+        request["project_id"] = str(request["project_id"])
+
+        if "mentor_id" in request and request["mentor_id"]:
+            request["mentor_id"] = str(request["mentor_id"])
+
+        # Format dates
+        if "created_at" in request:
+            request["created_at"] = request["created_at"].isoformat()
+
+    return requests
+
 
 class MentorshipRequest:
     @staticmethod
@@ -117,59 +216,25 @@ class MentorshipRequest:
     @staticmethod
     def get_mentor_requests(mentor_id):
         """
-        Get mentorship requests for potential mentors.
+        Get the requests shown to a mentor: every open request, including
+        ones the mentor ignored (the client lists those separately by
+        ignored_by), plus the requests assigned to the mentor.
 
         Args:
-            mentor_id: Mentor ID (unused, gets all pending requests)
+            mentor_id: Mentor ID
 
         Returns:
             list: List of requests with project and student details
         """
         try:
-            # Get all pending requests
-            requests = list(mentorship_requests.find())
-
-            # Process requests
-            for request in requests:
-                # Get project details
-                project = projects_collection.find_one({"_id": request["project_id"]})
-
-                if project:
-                    request["project"] = {
-                        "_id": str(project["_id"]),
-                        "title": project["title"],
-                        "abstract": project["abstract"],
-                        "created_by": str(project["created_by"]),
-                    }
-
-                    # Get project owner details
-                    owner = users_collection.find_one({"_id": project["created_by"]})
-                    if owner:
-                        request["project"]["owner_name"] = owner.get("name")
-                        request["project"]["owner_dept"] = owner.get("dept")
-
-                # Get student details
-                student = users_collection.find_one({"_id": request["student_id"]})
-                if student:
-                    request["student"] = {
-                        "_id": str(student["_id"]),
-                        "name": student["name"],
-                        "dept": student["dept"],
-                    }
-
-                # Convert ObjectIds to strings
-                request["_id"] = str(request["_id"])
-                request["student_id"] = str(request["student_id"])
-                request["project_id"] = str(request["project_id"])
-
-                if "mentor_id" in request and request["mentor_id"]:
-                    request["mentor_id"] = str(request["mentor_id"])
+            # Newest first; each $or branch is served by its own index
+            requests = list(
+                mentorship_requests.find(
+                    {"$or": [open_requests_query(), {"mentor_id": ObjectId(mentor_id)}]}
+                ).sort("created_at", DESCENDING)
+            )
 
-                # Format dates
-                if "created_at" in request:
-                    request["created_at"] = request["created_at"].isoformat()
-
-            return requests
+            return _hydrate_requests(requests)
 
         except Exception as e:
             logger.error(f"Error getting mentor requests: {e}")
@@ -460,8 +525,12 @@ class MentorshipRequest:
             list: List of alumni users
         """
         try:
-            # Find alumni users
-            mentors = list(users_collection.find({"role": "alumni"}))
+            # Find alumni users, leaving out credentials and search keys
+            mentors = list(
+                users_collection.find(
+                    {"role": "alumni"}, {"password": 0, "search_keys": 0}
+                )
+            )
 
             # Process mentors
             for mentor in mentors:
@@ -492,7 +561,8 @@ class MentorshipRequest:
             # Find alumni users willing to mentor
             mentors = list(
                 users_collection.find(
-                    {"role": "alumni", "willingness": willingness_type}
+                    {"role": "alumni", "willingness": willingness_type},
+                    {"password": 0, "search_keys": 0},
                 )
             )
 
@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.mentorship.models import MentorshipRequest
+from app.mentorship.matching import MentorMatcher, MENTOR_QUEUE_PAGE_SIZE
 from app.auth.models import User
 from app.utils.validators import validate_user_input
 from bson import ObjectId
+import click
 
 mentorship_bp = Blueprint("mentorship", __name__)
 
@@ -69,6 +71,38 @@ def get_mentorship_requests():
         return jsonify({"message": str(e)}), 500
 
 
+@mentorship_bp.route("/queue", methods=["GET"])
+@jwt_required()
+def get_mentor_queue():
+    try:
+        current_user = get_jwt_identity()
+        user = User.find_by_email(current_user)
+
+        if not user:
+            return jsonify({"message": "User not found"}), 404
+
+        # Only alumni have a queue
+        if user["role"].lower() != "alumni":
+            return jsonify({"message": "Unauthorized"}), 403
+
+        try:
+            page = int(request.args.get("page", 1))
+            per_page = int(request.args.get("per_page", MENTOR_QUEUE_PAGE_SIZE))
+        except ValueError:
+            return jsonify({"message": "Invalid page or per_page"}), 400
+
+        # Precomputed by `flask mentorship compute-queues`
+        queue = MentorMatcher.get_queue(
+            str(user["_id"]), user["email"], page=page, per_page=per_page
+        )
+
+        return jsonify(queue), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting mentor queue: {str(e)}")
+        return jsonify({"message": "An error occurred while fetching the queue"}), 500
+
+
 @mentorship_bp.route("/mentors", methods=["GET"])
 @jwt_required()
 def get_mentors():
@@ -186,3 +220,13 @@ def get_mentors_by_willingness(willingness_type):
     except Exception as e:
         current_app.logger.error(f"Error getting mentors by willingness: {str(e)}")
         return jsonify({"message": str(e)}), 500
+
+
+@mentorship_bp.cli.command("compute-queues")
+def compute_queues():
+    """Rank open mentorship requests for every mentor (run on a schedule)."""
+    report = MentorMatcher.compute()
+    click.echo(
+        f"Ranked {report['requests']} open requests for {report['mentors']} "
+        f"mentors ({report['full']} at capacity)"
+    )
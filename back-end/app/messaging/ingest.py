@@ -0,0 +1,279 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from app.models.base import conversations_collection, messages_collection
+from app.messaging.models import _last_message_snapshot, _participant_details
+from app.messaging.membership import conversation_members
+from app.utils.cache import user_summaries
+from app.analytics.metrics import DailyMetrics
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_FLUSH_INTERVAL = 0.05
+MESSAGE_FLUSH_MAX_RETRIES = 3
+
+
+def _utc(value):
+    """Make a datetime comparable whether or not Mongo returned it tz-aware."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class MessageIngestor:
+    """
+    Buffers socket messages per conversation and writes each burst with one
+    insert_many plus two conversation updates (unread counters, then the
+    last_message snapshot).
+
+    Messages get their _id and created_at when submitted, so they can be
+    emitted to the room straight away; a background task flushes the
+    buffers every MESSAGE_FLUSH_INTERVAL seconds. A message can be lost if
+    the worker dies inside that window.
+    """
+
+    def __init__(self, app=None):
+        self.flush_interval = MESSAGE_FLUSH_INTERVAL
+        self._buffers = defaultdict(list)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._started = False
+        self._metrics = {
+            "submitted": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "failures": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.flush_interval = app.config.get(
+            "MESSAGE_FLUSH_INTERVAL", MESSAGE_FLUSH_INTERVAL
+        )
+
+    def start(self, socketio):
+        """
+        Start the background flush task, once.
+
+        Args:
+            socketio: SocketIO instance used to spawn the task
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        socketio.start_background_task(self._flush_loop, socketio)
+
+    def submit(self, user_email, conversation_id, text, attachments=None, user_id=None):
+        """
+        Validate and buffer a message.
+
+        Args:
+            user_email: Email of the sender
+            conversation_id: ID of the conversation
+            text: Message text
+            attachments: List of attachment objects (optional)
+            user_id: Sender ID when already known, e.g. from the socket session
+
+        Returns:
+            dict: The message as returned by Message.create
+
+        Raises:
+            ValueError: If the sender or conversation is invalid
+        """
+        if user_id:
+            user = user_summaries.get(user_id)
+        else:
+            user = user_summaries.get_many_by_email([user_email]).get(user_email)
+        if not user:
+            raise ValueError("Invalid user")
+
+        participants = conversation_members.participants(conversation_id)
+        if participants is None:
+            raise ValueError("Conversation not found")
+
+        user_id = user["_id"]
+        if user_id not in participants:
+            raise ValueError("User is not a participant in this conversation")
+
+        now = datetime.now(timezone.utc)
+        message = {
+            "_id": ObjectId(),
+            "conversation_id": conversation_id,
+            "sender": user_id,
+            "text": text,
+            # Mongo stores milliseconds; match it so emitted and stored agree
+            "created_at": now.replace(microsecond=now.microsecond // 1000 * 1000),
+            "attachments": attachments or [],
+        }
+
+        with self._lock:
+            self._buffers[conversation_id].append(message)
+            self._metrics["submitted"] += 1
+
+        payload = dict(message)
+        payload["_id"] = str(message["_id"])
+        payload["created_at"] = message["created_at"].isoformat()
+        payload["read_by"] = [user_id]  # Sender has read their own message
+        payload["sender_details"] = _participant_details(user)
+        return payload
+
+    def flush(self):
+        """
+        Write every buffered message. Safe to call from any thread.
+
+        Returns:
+            int: Number of messages written
+        """
+        with self._lock:
+            buffers, self._buffers = self._buffers, defaultdict(list)
+
+        if not buffers:
+            return 0
+
+        written = 0
+        with self._flush_lock:
+            start = time.perf_counter()
+
+            for conversation_id, messages in buffers.items():
+                try:
+                    self._write(conversation_id, messages)
+                    written += len(messages)
+                except Exception as e:
+                    logger.error(
+                        f"Error flushing messages for conversation "
+                        f"{conversation_id}: {e}"
+                    )
+                    self._requeue(conversation_id, messages)
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._metrics["flushed"] += written
+            self._metrics["flushes"] += 1
+            self._metrics["last_flush_ms"] = round(elapsed_ms, 2)
+            self._metrics["max_flush_ms"] = round(
+                max(self._metrics["max_flush_ms"], elapsed_ms), 2
+            )
+            self._metrics["total_flush_ms"] += elapsed_ms
+
+        return written
+
+    def stats(self):
+        """Return queue depth, throughput and flush latency metrics."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["queue_depth"] = sum(len(b) for b in self._buffers.values())
+            metrics["rooms_pending"] = len(self._buffers)
+
+        total_ms = metrics.pop("total_flush_ms")
+        metrics["avg_flush_ms"] = (
+            round(total_ms / metrics["flushes"], 2) if metrics["flushes"] else 0.0
+        )
+        metrics["membership_cache"] = conversation_members.stats()
+        return metrics
+
+    def _write(self, conversation_id, messages):
+        """Insert a room's messages and update its conversation's inbox fields."""
+        try:
+            messages_collection.insert_many(
+                [{k: v for k, v in m.items() if k != "_retries"} for m in messages],
+                ordered=False,
+            )
+        except BulkWriteError as e:
+            # Duplicates mean an earlier attempt already stored those messages
+            if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+                raise
+
+        conversation_filter = {"_id": ObjectId(conversation_id)}
+        conversation = conversations_collection.find_one(
+            conversation_filter, {"read_state": 1}
+        )
+        read_state = (conversation or {}).get("read_state") or {}
+
+        # Every participant gets one unread per message sent by someone else
+        # after their read watermark; a buffered message can predate a
+        # mark_as_read that already reset their counter
+        unread = defaultdict(int)
+        for participant_id in conversation_members.participants(conversation_id) or ():
+            last_read_at = read_state.get(participant_id)
+            for message in messages:
+                if message["sender"] == participant_id:
+                    continue
+                if last_read_at and _utc(message["created_at"]) <= _utc(last_read_at):
+                    continue
+                unread[f"unread_counts.{participant_id}"] += 1
+
+        if unread:
+            conversations_collection.update_one(
+                conversation_filter, {"$inc": dict(unread)}
+            )
+
+        # A retried batch can be older than one already written; only move
+        # the snapshot forward. Timestamps are stored to the millisecond, so
+        # ties are broken on the message _id (or an empty snapshot)
+        last = max(messages, key=lambda m: (m["created_at"], m["_id"]))
+        last_at = last["created_at"]
+        conversations_collection.update_one(
+            {
+                **conversation_filter,
+                "$or": [
+                    {"updated_at": {"$lt": last_at}},
+                    {"updated_at": last_at, "last_message": None},
+                    {
+                        "updated_at": last_at,
+                        "last_message._id": {"$lt": str(last["_id"])},
+                    },
+                ],
+            },
+            {
+                "$set": {
+                    "updated_at": last["created_at"],
+                    "last_message": _last_message_snapshot(last),
+                }
+            },
+        )
+
+        DailyMetrics.record("message", count=len(messages))
+        for sender in {message["sender"] for message in messages}:
+            DailyMetrics.mark_active(user_id=sender)
+
+    def _requeue(self, conversation_id, messages):
+        """Put messages back for the next flush, dropping exhausted ones."""
+        retry = []
+        for message in messages:
+            message["_retries"] = message.get("_retries", 0) + 1
+            if message["_retries"] <= MESSAGE_FLUSH_MAX_RETRIES:
+                retry.append(message)
+
+        dropped = len(messages) - len(retry)
+        if dropped:
+            logger.error(
+                f"Dropping {dropped} messages for conversation {conversation_id}"
+            )
+
+        with self._lock:
+            self._buffers[conversation_id][:0] = retry
+            self._metrics["failures"] += 1
+
+    def _flush_loop(self, socketio):
+        while True:
+            socketio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error in message flush loop: {e}")
+
+
+# Shared instance, configured in create_app
+message_ingestor = MessageIngestor()
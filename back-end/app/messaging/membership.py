@@ -0,0 +1,97 @@
+import threading
+from bson import ObjectId
+from app.models.base import conversations_collection
+from app.utils.cache import TTLCache, user_summaries
+
+
+class ConversationMembership:
+    """
+    In-process caches used to authorize socket events without MongoDB:
+
+    * participant ID sets keyed by conversation ID, invalidated when a
+      conversation's participants change
+    * socket session ID to user ID, filled at login and dropped on
+      disconnect
+    """
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self._members = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def participants(self, conversation_id):
+        """
+        Get the participant IDs of a conversation.
+
+        Args:
+            conversation_id: Conversation ID
+
+        Returns:
+            frozenset: Participant user IDs, or None if not found
+        """
+        participants = self._members.get(conversation_id)
+        if participants is not None:
+            return participants
+
+        try:
+            conversation = conversations_collection.find_one(
+                {"_id": ObjectId(conversation_id)}, {"participants": 1}
+            )
+        except Exception:
+            return None
+
+        if not conversation:
+            return None
+
+        participants = frozenset(conversation["participants"])
+        self._members.set(conversation_id, participants)
+        return participants
+
+    def is_member(self, conversation_id, user_id):
+        """Check whether a user takes part in a conversation."""
+        participants = self.participants(conversation_id)
+        return participants is not None and user_id in participants
+
+    def invalidate(self, conversation_id):
+        """Drop a conversation's cached participants."""
+        self._members.pop(str(conversation_id))
+
+    def bind_session(self, sid, user_email):
+        """
+        Remember which user owns a socket session.
+
+        Args:
+            sid: Socket.IO session ID
+            user_email: User email
+
+        Returns:
+            str: User ID, or None if the user does not exist
+        """
+        user = user_summaries.get_many_by_email([user_email]).get(user_email)
+        if not user:
+            return None
+
+        with self._lock:
+            self._sessions[sid] = user["_id"]
+        return user["_id"]
+
+    def session_user(self, sid):
+        """Return the user ID bound to a socket session, if any."""
+        with self._lock:
+            return self._sessions.get(sid)
+
+    def unbind_session(self, sid):
+        """Forget a socket session."""
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def stats(self):
+        """Return membership cache counters and the number of sessions."""
+        stats = self._members.stats()
+        with self._lock:
+            stats["sessions"] = len(self._sessions)
+        return stats
+
+
+# Shared instance used by socket handlers and the message ingestor
+conversation_members = ConversationMembership()
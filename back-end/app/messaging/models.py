@@ -5,11 +5,97 @@ from app.models.base import (
 )
 from bson import ObjectId
 from datetime import datetime, timezone
-from pymongo import DESCENDING
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from app.utils.cache import user_summaries
+from app.messaging.membership import conversation_members
+from app.analytics.metrics import DailyMetrics
+from app.utils.helpers import decode_cursor, encode_cursor, keyset_filter
 import logging
 
 logger = logging.getLogger(__name__)
 
+MESSAGE_PAGE_SIZE = 20
+MESSAGE_PAGE_SIZE_MAX = 100
+# Stored on conversations whose last_message and unread_counts are
+# maintained by the write paths; older conversations are backfilled on read
+INBOX_VERSION = 1
+
+INDEXES = {
+    "messages": [
+        IndexModel(
+            [
+                ("conversation_id", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ],
+            name="conversation_id_1_created_at_-1__id_-1",
+        ),
+    ],
+    "conversations": [
+        IndexModel(
+            [("participants", ASCENDING), ("updated_at", DESCENDING)],
+            name="participants_1_updated_at_-1",
+        ),
+    ],
+}
+
+
+def _last_message_snapshot(message):
+    """Build the last_message snapshot stored on a conversation."""
+    return {
+        "_id": str(message["_id"]),
+        "conversation_id": message["conversation_id"],
+        "sender": message["sender"],
+        "text": message.get("text", ""),
+        "created_at": message["created_at"],
+    }
+
+
+def _unread_query(conversation_id, user_id, read_state):
+    """
+    Build the query for a participant's unread messages. Uses the read
+    watermark when there is one and the legacy read_by arrays otherwise.
+    """
+    query = {"conversation_id": conversation_id, "sender": {"$ne": user_id}}
+    if user_id in read_state:
+        query["created_at"] = {"$gt": read_state[user_id]}
+    else:
+        query["read_by"] = {"$nin": [user_id]}
+    return query
+
+
+def _read_by(message, read_state):
+    """
+    List the participants who have read a message: its sender, everyone
+    whose read watermark is at or after it, plus any legacy read_by entries.
+    """
+    readers = {message["sender"], *message.get("read_by", [])}
+    readers.update(
+        user_id
+        for user_id, last_read_at in read_state.items()
+        if last_read_at >= message["created_at"]
+    )
+    return sorted(readers)
+
+
+def _get_read_state(conversation_id):
+    """Load a conversation's read watermarks keyed by user ID."""
+    conversation = conversations_collection.find_one(
+        {"_id": ObjectId(conversation_id)}, {"read_state": 1}
+    )
+    return (conversation or {}).get("read_state") or {}
+
+
+def _participant_details(user):
+    """Format a user summary for conversation and message payloads."""
+    return {
+        "_id": str(user["_id"]),
+        "name": user.get("name", "Unknown"),
+        "email": user.get("email", ""),
+        "role": user.get("role", ""),
+        "dept": user.get("dept", ""),
+    }
+
 
 class Conversation:
     @staticmethod
@@ -55,9 +141,14 @@ class Conversation:
                 "created_at": datetime.now(timezone.utc),
                 "updated_at": datetime.now(timezone.utc),
                 "last_message": None,
+                "unread_counts": {
+                    participant_id: 0 for participant_id in valid_participants
+                },
+                "inbox_version": INBOX_VERSION,
             }
 
             result = conversations_collection.insert_one(conversation)
+            conversation_members.invalidate(result.inserted_id)
             return str(result.inserted_id)
 
         except Exception as e:
@@ -85,23 +176,19 @@ class Conversation:
                 conversation["_id"] = str(conversation["_id"])
 
                 # Get participant details
-                participants = []
-                for user_id in conversation["participants"]:
-                    user = users_collection.find_one({"_id": ObjectId(user_id)})
-
-                    if user:
-                        participants.append(
-                            {
-                                "_id": str(user["_id"]),
-                                "name": user.get("name", "Unknown"),
-                                "email": user.get("email", ""),
-                                "role": user.get("role", ""),
-                                "dept": user.get("dept", ""),
-                            }
-                        )
+                users = user_summaries.get_many(conversation["participants"])
+                participants = [
+                    _participant_details(users[user_id])
+                    for user_id in conversation["participants"]
+                    if user_id in users
+                ]
 
                 conversation["participant_details"] = participants
 
+                last_message = conversation.get("last_message")
+                if last_message and "created_at" in last_message:
+                    last_message["created_at"] = last_message["created_at"].isoformat()
+
                 # Format dates
                 if "created_at" in conversation:
                     conversation["created_at"] = conversation["created_at"].isoformat()
@@ -119,6 +206,10 @@ class Conversation:
         """
         Get all conversations for a user.
 
+        The inbox is served from the last_message snapshot and unread_counts
+        stored on each conversation, so it costs one conversation query plus
+        one batched user lookup.
+
         Args:
             user_email: User email
 
@@ -126,12 +217,12 @@ class Conversation:
             list: List of conversations
         """
         try:
-            user = users_collection.find_one({"email": user_email})
+            user = user_summaries.get_many_by_email([user_email]).get(user_email)
 
             if not user:
                 return []
 
-            user_id = str(user["_id"])
+            user_id = user["_id"]
 
             # Find all conversations where the user is a participant
             conversations = list(
@@ -140,57 +231,38 @@ class Conversation:
                 )
             )
 
+            # Fetch every other participant across all conversations at once
+            users = user_summaries.get_many(
+                participant_id
+                for conv in conversations
+                for participant_id in conv["participants"]
+                if participant_id != user_id
+            )
+
             result = []
             for conv in conversations:
+                # Conversations created before the inbox fields existed. Their
+                # unread_counts may already be partly set by new messages, so
+                # the marker field decides, not unread_counts itself
+                if conv.get("inbox_version") != INBOX_VERSION:
+                    Conversation._backfill_inbox_fields(conv)
+
                 # Convert ObjectId to string
                 conv["_id"] = str(conv["_id"])
 
                 # Get the other participants' details
-                other_participants = []
-                for participant_id in conv["participants"]:
-                    if participant_id != user_id:
-                        other_user = users_collection.find_one(
-                            {"_id": ObjectId(participant_id)}
-                        )
-
-                        if other_user:
-                            other_participants.append(
-                                {
-                                    "_id": str(other_user["_id"]),
-                                    "name": other_user.get("name", "Unknown"),
-                                    "email": other_user.get("email", ""),
-                                    "role": other_user.get("role", ""),
-                                    "dept": other_user.get("dept", ""),
-                                }
-                            )
-
-                conv["other_participants"] = other_participants
-
-                # Get unread count
-                unread_count = messages_collection.count_documents(
-                    {
-                        "conversation_id": conv["_id"],
-                        "sender": {"$ne": user_id},
-                        "read_by": {"$nin": [user_id]},
-                    }
-                )
-
-                conv["unread_count"] = unread_count
+                conv["other_participants"] = [
+                    _participant_details(users[participant_id])
+                    for participant_id in conv["participants"]
+                    if participant_id != user_id and participant_id in users
+                ]
 
-                # Get last message
-                last_message = messages_collection.find_one(
-                    {"conversation_id": conv["_id"]}, sort=[("created_at", DESCENDING)]
-                )
+                conv["unread_count"] = conv.pop("unread_counts", {}).get(user_id, 0)
+                conv.pop("inbox_version", None)
 
-                if last_message:
-                    last_message["_id"] = str(last_message["_id"])
-
-                    if "created_at" in last_message:
-                        last_message["created_at"] = last_message[
-                            "created_at"
-                        ].isoformat()
-
-                    conv["last_message"] = last_message
+                last_message = conv.get("last_message")
+                if last_message and "created_at" in last_message:
+                    last_message["created_at"] = last_message["created_at"].isoformat()
 
                 # Format dates
                 if "created_at" in conv:
@@ -206,6 +278,46 @@ class Conversation:
             logger.error(f"Error in Conversation.get_for_user: {e}")
             return []
 
+    @staticmethod
+    def _backfill_inbox_fields(conv):
+        """
+        Compute and store last_message and unread_counts for a conversation
+        that predates them. Updates conv in place.
+
+        Args:
+            conv: Conversation document as read from MongoDB
+        """
+        conversation_id = str(conv["_id"])
+        read_state = conv.get("read_state") or {}
+
+        unread_counts = {
+            participant_id: messages_collection.count_documents(
+                _unread_query(conversation_id, participant_id, read_state)
+            )
+            for participant_id in conv["participants"]
+        }
+
+        last_message = messages_collection.find_one(
+            {"conversation_id": conversation_id},
+            sort=[("created_at", DESCENDING), ("_id", DESCENDING)],
+        )
+        if last_message:
+            last_message = _last_message_snapshot(last_message)
+
+        conversations_collection.update_one(
+            {"_id": conv["_id"], "inbox_version": {"$ne": INBOX_VERSION}},
+            {
+                "$set": {
+                    "unread_counts": unread_counts,
+                    "last_message": last_message,
+                    "inbox_version": INBOX_VERSION,
+                }
+            },
+        )
+
+        conv["unread_counts"] = unread_counts
+        conv["last_message"] = last_message
+
     @staticmethod
     def mark_as_read(conversation_id, user_email):
         """
@@ -218,30 +330,104 @@ class Conversation:
         Returns:
             bool: Success status
         """
-        try:
-            user = users_collection.find_one({"email": user_email})
+        user = user_summaries.get_many_by_email([user_email]).get(user_email)
+        if not user:
+            return False
 
-            if not user:
-                return False
+        return Conversation.mark_as_read_by_id(conversation_id, user["_id"])
 
-            user_id = str(user["_id"])
+    @staticmethod
+    def mark_as_read_by_id(conversation_id, user_id):
+        """
+        Mark all messages in a conversation as read for a participant by
+        moving their read watermark to now. A single update, whatever the
+        length of the conversation; a user who is not a participant leaves
+        the conversation untouched.
+
+        Args:
+            conversation_id: Conversation ID
+            user_id: User ID
 
-            # Update all unread messages
-            messages_collection.update_many(
+        Returns:
+            bool: Success status
+        """
+        try:
+            # Move the watermark and reset the user's inbox counter
+            result = conversations_collection.update_one(
+                {"_id": ObjectId(conversation_id), "participants": user_id},
                 {
-                    "conversation_id": conversation_id,
-                    "sender": {"$ne": user_id},
-                    "read_by": {"$nin": [user_id]},
+                    "$set": {
+                        f"read_state.{user_id}": datetime.now(timezone.utc),
+                        f"unread_counts.{user_id}": 0,
+                    }
                 },
-                {"$addToSet": {"read_by": user_id}},
             )
 
-            return True
+            return result.matched_count > 0
 
         except Exception as e:
             logger.error(f"Error marking conversation as read: {e}")
             return False
 
+    @staticmethod
+    def migrate_read_state(unset_read_by=False):
+        """
+        Derive read watermarks from the legacy per-message read_by arrays.
+
+        Each participant's watermark becomes the newest message from someone
+        else that they had read, and unread_counts are recomputed from it.
+
+        Args:
+            unset_read_by: Remove the read_by arrays from messages afterwards
+
+        Returns:
+            int: Number of conversations migrated
+        """
+        migrated = 0
+
+        for conv in conversations_collection.find(
+            {}, {"participants": 1, "read_state": 1}
+        ):
+            conversation_id = str(conv["_id"])
+            read_state = conv.get("read_state") or {}
+
+            for participant_id in conv["participants"]:
+                if participant_id in read_state:
+                    continue
+
+                last_read = messages_collection.find_one(
+                    {
+                        "conversation_id": conversation_id,
+                        "sender": {"$ne": participant_id},
+                        "read_by": participant_id,
+                    },
+                    {"created_at": 1},
+                    sort=[("created_at", DESCENDING), ("_id", DESCENDING)],
+                )
+                if last_read:
+                    read_state[participant_id] = last_read["created_at"]
+
+            unread_counts = {
+                participant_id: messages_collection.count_documents(
+                    _unread_query(conversation_id, participant_id, read_state)
+                )
+                for participant_id in conv["participants"]
+            }
+
+            conversations_collection.update_one(
+                {"_id": conv["_id"]},
+                {"$set": {"read_state": read_state, "unread_counts": unread_counts}},
+            )
+            migrated += 1
+
+            if unset_read_by:
+                messages_collection.update_many(
+                    {"conversation_id": conversation_id, "read_by": {"$exists": True}},
+                    {"$unset": {"read_by": ""}},
+                )
+
+        return migrated
+
 
 class Message:
     @staticmethod
@@ -286,28 +472,37 @@ class Message:
                 "sender": user_id,
                 "text": text,
                 "created_at": now,
-                "read_by": [user_id],  # Sender has read their own message
                 "attachments": attachments or [],
             }
 
             result = messages_collection.insert_one(message)
             message_id = str(result.inserted_id)
+            DailyMetrics.record("message", user_id=user_id)
+
+            # Update the conversation's inbox snapshot and unread counters
+            update = {
+                "$set": {
+                    "updated_at": now,
+                    "last_message": _last_message_snapshot(message),
+                }
+            }
+            unread = {
+                f"unread_counts.{participant_id}": 1
+                for participant_id in conversation["participants"]
+                if participant_id != user_id
+            }
+            if unread:
+                update["$inc"] = unread
 
-            # Update conversation's last update time
             conversations_collection.update_one(
-                {"_id": ObjectId(conversation_id)}, {"$set": {"updated_at": now}}
+                {"_id": ObjectId(conversation_id)}, update
             )
 
             # Return the created message with additional info
             message["_id"] = message_id
             message["created_at"] = message["created_at"].isoformat()
-            message["sender_details"] = {
-                "_id": user_id,
-                "name": user.get("name", "Unknown"),
-                "email": user.get("email", ""),
-                "role": user.get("role", ""),
-                "dept": user.get("dept", ""),
-            }
+            message["read_by"] = [user_id]  # Sender has read their own message
+            message["sender_details"] = _participant_details(user)
 
             return message
 
@@ -345,23 +540,19 @@ class Message:
                 .limit(per_page)
             )
 
+            # Get sender details for the whole page at once
+            senders = user_summaries.get_many(msg["sender"] for msg in messages)
+            read_state = _get_read_state(conversation_id)
+
             # Process messages
             result = []
             for msg in messages:
                 # Convert ObjectId to string
                 msg["_id"] = str(msg["_id"])
+                msg["read_by"] = _read_by(msg, read_state)
 
-                # Get sender details
-                sender = users_collection.find_one({"_id": ObjectId(msg["sender"])})
-
-                if sender:
-                    msg["sender_details"] = {
-                        "_id": str(sender["_id"]),
-                        "name": sender.get("name", "Unknown"),
-                        "email": sender.get("email", ""),
-                        "role": sender.get("role", ""),
-                        "dept": sender.get("dept", ""),
-                    }
+                if msg["sender"] in senders:
+                    msg["sender_details"] = _participant_details(senders[msg["sender"]])
 
                 # Format date
                 if "created_at" in msg:
@@ -389,3 +580,93 @@ class Message:
                 "per_page": per_page,
                 "pages": 0,
             }
+
+    @staticmethod
+    def get_history(
+        conversation_id,
+        before=None,
+        after=None,
+        limit=MESSAGE_PAGE_SIZE,
+        include_total=False,
+    ):
+        """
+        Get messages for a conversation using keyset pagination.
+
+        Without a cursor the latest messages are returned. Pass next_cursor
+        back as before to scroll into older history, or as after to fetch
+        messages newer than a page. Each page costs the same at any depth.
+
+        Args:
+            conversation_id: ID of the conversation
+            before: Cursor; return messages older than it
+            after: Cursor; return messages newer than it
+            limit: Number of messages per page (capped at MESSAGE_PAGE_SIZE_MAX)
+            include_total: Count the conversation's messages (first page only)
+
+        Returns:
+            dict: Messages in chronological order, next_cursor and
+                  optionally total
+
+        Raises:
+            ValueError: If the cursor or arguments are invalid
+        """
+        if before and after:
+            raise ValueError("Use either before or after, not both")
+
+        limit = max(1, min(int(limit), MESSAGE_PAGE_SIZE_MAX))
+        direction = ASCENDING if after else DESCENDING
+
+        query = {"conversation_id": conversation_id}
+        if before or after:
+            query.update(
+                keyset_filter("created_at", decode_cursor(before or after), direction)
+            )
+
+        try:
+            # Fetch one extra row to know whether another page exists
+            messages = list(
+                messages_collection.find(query)
+                .sort([("created_at", direction), ("_id", direction)])
+                .limit(limit + 1)
+            )
+
+            has_more = len(messages) > limit
+            messages = messages[:limit]
+
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_cursor(
+                    messages[-1]["created_at"], messages[-1]["_id"]
+                )
+
+            # Return oldest first, as the legacy endpoint does
+            if direction == DESCENDING:
+                messages.reverse()
+
+            # Get sender details for the whole page at once
+            senders = user_summaries.get_many(msg["sender"] for msg in messages)
+            read_state = _get_read_state(conversation_id)
+
+            for msg in messages:
+                msg["_id"] = str(msg["_id"])
+                msg["read_by"] = _read_by(msg, read_state)
+
+                if msg["sender"] in senders:
+                    msg["sender_details"] = _participant_details(senders[msg["sender"]])
+
+                if "created_at" in msg:
+                    msg["created_at"] = msg["created_at"].isoformat()
+
+            page = {"messages": messages, "next_cursor": next_cursor}
+
+            # Only the first page pays for the count
+            if include_total and not (before or after):
+                page["total"] = messages_collection.count_documents(
+                    {"conversation_id": conversation_id}
+                )
+
+            return page
+
+        except Exception as e:
+            logger.error(f"Error getting message history: {e}")
+            return {"messages": [], "next_cursor": None}
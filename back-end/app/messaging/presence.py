@@ -0,0 +1,217 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, IndexModel
+from app.models.base import db
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_TTL = 90
+
+INDEXES = {
+    "presence": [
+        IndexModel([("email", ASCENDING)], name="email_1"),
+        IndexModel(
+            [("expires_at", ASCENDING)], name="expires_at_1", expireAfterSeconds=0
+        ),
+    ],
+}
+
+
+class MemoryPresenceBackend:
+    """
+    Presence kept in this process. Only suitable for a single worker and
+    for tests.
+    """
+
+    def __init__(self, ttl=PRESENCE_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def add(self, sid, email):
+        with self._lock:
+            self._sessions[sid] = (email, time.monotonic() + self.ttl)
+
+    def remove(self, sid):
+        with self._lock:
+            entry = self._sessions.pop(sid, None)
+        return entry[0] if entry else None
+
+    def refresh(self, sids):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for sid in sids:
+                if sid in self._sessions:
+                    self._sessions[sid] = (self._sessions[sid][0], expires)
+
+    def online(self, emails):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                email
+                for email, expires in self._sessions.values()
+                if expires > now and email in emails
+            }
+
+
+class MongoPresenceBackend:
+    """
+    Presence shared by every worker through the presence collection. Each
+    socket session is one document whose expires_at is pushed forward by
+    the worker holding the session; a TTL index removes sessions left
+    behind by workers that died.
+    """
+
+    def __init__(self, ttl=PRESENCE_TTL, collection=None):
+        self.ttl = ttl
+        self.collection = collection if collection is not None else db["presence"]
+
+    def _expires_at(self):
+        return datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+
+    def add(self, sid, email):
+        self.collection.update_one(
+            {"_id": sid},
+            {"$set": {"email": email, "expires_at": self._expires_at()}},
+            upsert=True,
+        )
+
+    def remove(self, sid):
+        session = self.collection.find_one_and_delete({"_id": sid})
+        return session["email"] if session else None
+
+    def refresh(self, sids):
+        if sids:
+            self.collection.update_many(
+                {"_id": {"$in": list(sids)}},
+                {"$set": {"expires_at": self._expires_at()}},
+            )
+
+    def online(self, emails):
+        return set(
+            self.collection.distinct(
+                "email",
+                {
+                    "email": {"$in": list(emails)},
+                    "expires_at": {"$gt": datetime.now(timezone.utc)},
+                },
+            )
+        )
+
+
+class Presence:
+    """
+    Tracks which users have a live socket connection.
+
+    Configured from PRESENCE_BACKEND ("memory" or "mongo") and PRESENCE_TTL.
+    Sessions opened by this worker are refreshed by a background task, so
+    a user stays online as long as their socket is connected to any worker.
+    """
+
+    backends = {
+        "memory": MemoryPresenceBackend,
+        "mongo": MongoPresenceBackend,
+    }
+
+    def __init__(self, app=None):
+        self.backend = MemoryPresenceBackend()
+        self._local_sids = set()
+        self._refresher_started = False
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get("PRESENCE_BACKEND", "memory")
+        ttl = app.config.get("PRESENCE_TTL", PRESENCE_TTL)
+
+        if backend not in self.backends:
+            raise ValueError(f"Unknown presence backend: {backend}")
+
+        self.backend = self.backends[backend](ttl=ttl)
+
+    def connect(self, sid, email):
+        """
+        Record a socket session for a user.
+
+        Args:
+            sid: Socket.IO session ID
+            email: User email
+
+        Returns:
+            bool: True if the user was offline before this session
+        """
+        was_online = self.is_online(email)
+        self.backend.add(sid, email)
+        with self._lock:
+            self._local_sids.add(sid)
+        return not was_online
+
+    def disconnect(self, sid):
+        """
+        Drop a socket session.
+
+        Args:
+            sid: Socket.IO session ID
+
+        Returns:
+            str: Email of a user who has no sessions left, or None
+        """
+        with self._lock:
+            self._local_sids.discard(sid)
+
+        email = self.backend.remove(sid)
+        if email and not self.is_online(email):
+            return email
+        return None
+
+    def is_online(self, email):
+        return bool(self.backend.online({email}))
+
+    def online(self, emails):
+        """
+        Filter a list of emails down to the users currently online.
+
+        Args:
+            emails: Iterable of user emails
+
+        Returns:
+            set: Emails of online users
+        """
+        return self.backend.online(set(emails))
+
+    def refresh(self):
+        """Extend the TTL of every session held by this worker."""
+        with self._lock:
+            sids = list(self._local_sids)
+        self.backend.refresh(sids)
+
+    def start_refresher(self, socketio):
+        """
+        Start the background task refreshing this worker's sessions, once.
+
+        Args:
+            socketio: SocketIO instance used to spawn the task
+        """
+        with self._lock:
+            if self._refresher_started:
+                return
+            self._refresher_started = True
+
+        socketio.start_background_task(self._refresh_loop, socketio)
+
+    def _refresh_loop(self, socketio):
+        interval = max(1, self.backend.ttl // 3)
+        while True:
+            socketio.sleep(interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Error refreshing presence: {e}")
+
+
+# Shared instance, configured in create_app
+presence = Presence()
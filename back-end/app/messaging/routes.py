@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.messaging.models import Conversation, Message
-from app.auth.models import User
+import click
+from app.messaging.models import Conversation, Message, MESSAGE_PAGE_SIZE
+from app.messaging.presence import presence
+from app.messaging.ingest import message_ingestor
+from app.auth.models import User, USER_SEARCH_LIMIT
 from app.utils.validators import validate_user_input
 
 messaging_bp = Blueprint("messaging", __name__)
@@ -64,10 +67,6 @@ def get_messages(conversation_id):
     try:
         current_user = get_jwt_identity()
 
-        # Get pagination parameters
-        page = int(request.args.get("page", 1))
-        per_page = int(request.args.get("per_page", 20))
-
         # Get user
         user = User.find_by_email(current_user)
 
@@ -84,6 +83,29 @@ def get_messages(conversation_id):
         if str(user["_id"]) not in conversation["participants"]:
             return jsonify({"error": "Unauthorized"}), 403
 
+        before = request.args.get("before")
+        after = request.args.get("after")
+        limit = request.args.get("limit")
+
+        # Cursor mode when the client asks for it, page numbers otherwise
+        if before or after or limit:
+            try:
+                messages = Message.get_history(
+                    conversation_id,
+                    before=before,
+                    after=after,
+                    limit=int(limit or MESSAGE_PAGE_SIZE),
+                    include_total=request.args.get("include_total", "").lower()
+                    in ["true", "1", "yes"],
+                )
+            except ValueError:
+                return jsonify({"error": "Invalid cursor or limit"}), 400
+            return jsonify(messages), 200
+
+        # Get pagination parameters
+        page = int(request.args.get("page", 1))
+        per_page = int(request.args.get("per_page", 20))
+
         # Get messages
         messages = Message.get_by_conversation(conversation_id, page, per_page)
 
@@ -105,11 +127,50 @@ def search_users():
         role = request.args.get("role", "")
         dept = request.args.get("dept", "")
 
+        try:
+            limit = int(request.args.get("limit", USER_SEARCH_LIMIT))
+        except ValueError:
+            return jsonify({"error": "Invalid limit"}), 400
+
         # Search users
-        users = User.search_users(query, role, dept, current_user)
+        users = User.search_users(query, role, dept, current_user, limit)
 
         return jsonify(users), 200
 
     except Exception as e:
         current_app.logger.error(f"Error searching users: {e}")
         return jsonify({"error": "Failed to search users"}), 500
+
+
+@messaging_bp.route("/users/online", methods=["GET"])
+@jwt_required()
+def get_online_users():
+    try:
+        emails = [e for e in request.args.get("emails", "").split(",") if e]
+
+        return jsonify({"online": sorted(presence.online(emails))}), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting online users: {e}")
+        return jsonify({"error": "Failed to get online users"}), 500
+
+
+@messaging_bp.route("/messaging/metrics", methods=["GET"])
+@jwt_required()
+def get_messaging_metrics():
+    try:
+        return jsonify({"ingest": message_ingestor.stats()}), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting messaging metrics: {e}")
+        return jsonify({"error": "Failed to get messaging metrics"}), 500
+
+
+@messaging_bp.cli.command("migrate-read-state")
+@click.option(
+    "--unset-read-by", is_flag=True, help="Remove read_by arrays from messages."
+)
+def migrate_read_state_command(unset_read_by):
+    """Build conversation read watermarks from message read_by arrays."""
+    migrated = Conversation.migrate_read_state(unset_read_by=unset_read_by)
+    click.echo(f"Migrated read state for {migrated} conversations")
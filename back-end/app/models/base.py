@@ -1,12 +1,18 @@
 from pymongo import MongoClient
 import logging
+import os
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 # Database connection
 try:
-    client = MongoClient("mongodb://localhost:27017/")
+    # Size the pool per worker process; gunicorn.conf.py derives it from
+    # the worker count when running under gunicorn
+    client = MongoClient(
+        "mongodb://localhost:27017/",
+        maxPoolSize=int(os.environ.get("MONGO_MAX_POOL_SIZE", 100)),
+    )
     db = client["imperious"]
     logger.info("Connected successfully to MongoDB")
 except Exception as e:
@@ -16,16 +22,22 @@ except Exception as e:
 # Collections
 users_collection = db["users"]
 feeds_collection = db["feeds"]
+timelines_collection = db["timelines"]
 news_events_collection = db["news_events"]
 projects_collection = db["projects"]
 student_records_collection = db["student_records"]
+student_records_meta_collection = db["student_records_meta"]
 mentorship_requests = db["mentorship_requests"]
 collaboration_requests = db["collaboration_requests"]
 job_profiles_collection = db["job_profiles"]
 jobs_collection = db["jobs"]
 connections_collection = db["connections"]
 connection_requests_collection = db["connection_requests"]
+suggestions_collection = db["connection_suggestions"]
 conversations_collection = db["conversations"]
 messages_collection = db["messages"]
 pending_staff_collection = db["pending_staff_registrations"]
 bug_reports_collection = db["bug_reports"]
+analytics_snapshots_collection = db["analytics_snapshots"]
+metrics_daily_collection = db["metrics_daily"]
+mentor_queues_collection = db["mentor_queues"]
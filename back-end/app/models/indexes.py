@@ -0,0 +1,157 @@
+import importlib
+import logging
+import click
+from flask.cli import AppGroup
+from pymongo.errors import OperationFailure
+from app.models.base import db
+
+logger = logging.getLogger(__name__)
+
+# Modules that declare an INDEXES registry, mapping collection names to
+# lists of pymongo IndexModel objects
+INDEX_MODULES = [
+    "app.auth.models",
+    "app.feeds.models",
+    "app.projects.models",
+    "app.collaborations.models",
+    "app.mentorship.models",
+    "app.jobs.models",
+    "app.news_events.models",
+    "app.connections.models",
+    "app.messaging.models",
+    "app.messaging.presence",
+    "app.analytics.metrics",
+    "app.connections.suggestions",
+]
+
+indexes_cli = AppGroup("indexes", help="Manage MongoDB indexes.")
+
+
+def collect_indexes():
+    """
+    Gather the declared indexes from every registered module.
+
+    Returns:
+        dict: Lists of IndexModel keyed by collection name
+    """
+    declared = {}
+    for module_name in INDEX_MODULES:
+        module = importlib.import_module(module_name)
+        for collection_name, models in getattr(module, "INDEXES", {}).items():
+            declared.setdefault(collection_name, []).extend(models)
+    return declared
+
+
+def sync_indexes(dry_run=False, drop_undeclared=False):
+    """
+    Reconcile MongoDB indexes with the declared registry.
+
+    Missing indexes are created; existing ones with the same name are left
+    untouched, so running this repeatedly is safe.
+
+    Args:
+        dry_run: Only report what would change
+        drop_undeclared: Drop indexes that are not declared anywhere
+
+    Returns:
+        dict: Report with missing (dry run), created, conflicting,
+              undeclared, unused and failed indexes as
+              "collection.index_name" strings
+    """
+    report = {
+        "missing": [],
+        "created": [],
+        "conflicts": [],
+        "undeclared": [],
+        "unused": [],
+        "failed": [],
+    }
+
+    for collection_name, models in collect_indexes().items():
+        collection = db[collection_name]
+        existing = collection.index_information()
+        declared_names = set()
+
+        for model in models:
+            spec = model.document
+            name = spec["name"]
+            declared_names.add(name)
+            label = f"{collection_name}.{name}"
+
+            if name in existing:
+                if list(existing[name]["key"]) != list(spec["key"].items()):
+                    report["conflicts"].append(label)
+                continue
+
+            if dry_run:
+                report["missing"].append(label)
+                continue
+
+            try:
+                collection.create_indexes([model])
+                report["created"].append(label)
+            except OperationFailure as e:
+                logger.error(f"Could not create index {label}: {e}")
+                report["failed"].append(label)
+
+        for name in existing:
+            if name == "_id_" or name in declared_names:
+                continue
+
+            label = f"{collection_name}.{name}"
+            report["undeclared"].append(label)
+            if drop_undeclared and not dry_run:
+                collection.drop_index(name)
+
+        report["unused"].extend(
+            f"{collection_name}.{name}" for name in _unused_indexes(collection)
+        )
+
+    return report
+
+
+def _unused_indexes(collection):
+    """
+    List indexes with no recorded accesses since the server last started.
+
+    Args:
+        collection: pymongo Collection
+
+    Returns:
+        list: Index names
+    """
+    try:
+        stats = collection.aggregate([{"$indexStats": {}}])
+        return [
+            stat["name"]
+            for stat in stats
+            if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0
+        ]
+    except Exception as e:
+        # $indexStats needs the clusterMonitor role on some deployments
+        logger.warning(f"Could not read index stats for {collection.name}: {e}")
+        return []
+
+
+def _echo_report(report):
+    """Print a sync report grouped by category."""
+    for key, labels in report.items():
+        click.echo(f"{key}: {len(labels)}")
+        for label in labels:
+            click.echo(f"  {label}")
+
+
+@indexes_cli.command("sync")
+@click.option("--dry-run", is_flag=True, help="Report changes without applying.")
+@click.option(
+    "--drop-undeclared", is_flag=True, help="Drop indexes missing from the registry."
+)
+def sync_command(dry_run, drop_undeclared):
+    """Create missing indexes and report unused or undeclared ones."""
+    _echo_report(sync_indexes(dry_run=dry_run, drop_undeclared=drop_undeclared))
+
+
+@indexes_cli.command("report")
+def report_command():
+    """Report missing, undeclared and unused indexes without changing any."""
+    _echo_report(sync_indexes(dry_run=True))
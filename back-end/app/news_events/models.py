@@ -3,9 +3,21 @@ from bson import ObjectId
 from datetime import datetime
 import logging
 from functools import lru_cache
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from app.utils.cache import user_summaries
 
 logger = logging.getLogger(__name__)
 
+INDEXES = {
+    "news_events": [
+        IndexModel(
+            [("type", ASCENDING), ("created_at", DESCENDING)],
+            name="type_1_created_at_-1",
+        ),
+        IndexModel([("author_id", ASCENDING)], name="author_id_1"),
+    ],
+}
+
 
 # Create a cache clear function outside the class
 def clear_news_events_cache():
@@ -77,6 +89,11 @@ class NewsEvent:
             .limit(limit)
         )
 
+        # Get author info for the whole page at once
+        authors = user_summaries.get_many(
+            item["author_id"] for item in items if "author_id" in item
+        )
+
         # Process items
         for item in items:
             # Convert ObjectId to string
@@ -85,9 +102,7 @@ class NewsEvent:
             # Get author info
             if "author_id" in item:
                 try:
-                    author = users_collection.find_one(
-                        {"_id": ObjectId(item["author_id"])}
-                    )
+                    author = authors.get(str(item["author_id"]))
                     if author:
                         item["author"] = {
                             "name": author["name"],
@@ -130,9 +145,7 @@ class NewsEvent:
 
                 # Get author info
                 if "author_id" in item:
-                    author = users_collection.find_one(
-                        {"_id": ObjectId(item["author_id"])}
-                    )
+                    author = user_summaries.get(item["author_id"])
                     if author:
                         item["author"] = {
                             "name": author["name"],
@@ -1,6 +1,8 @@
 from app.models.base import users_collection, job_profiles_collection
 from datetime import datetime, timezone
 from bson import ObjectId
+from app.utils.cache import user_summaries
+from app.utils.search import SEARCH_KEYS_VERSION, build_search_keys
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,7 +22,13 @@ class Profile:
             bool: Success status
         """
         try:
+            # Keep the typeahead keys in step with the name
+            if "name" in data:
+                data["search_keys"] = build_search_keys(data["name"], email)
+                data["search_keys_version"] = SEARCH_KEYS_VERSION
+
             users_collection.update_one({"email": email}, {"$set": data})
+            user_summaries.invalidate(email=email)
             return True
         except Exception as e:
             logger.error(f"Error updating profile: {e}")
@@ -1,10 +1,33 @@
-from app.models.base import projects_collection, users_collection
+from app.models.base import projects_collection
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from app.utils.cache import user_summaries
+from app.analytics.metrics import DailyMetrics
 import logging
 
 logger = logging.getLogger(__name__)
 
+INDEXES = {
+    "projects": [
+        IndexModel([("created_by", ASCENDING)], name="created_by_1"),
+        IndexModel([("mentor_id", ASCENDING)], name="mentor_id_1", sparse=True),
+        IndexModel(
+            [("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="created_at_-1__id_-1",
+        ),
+        # Explore pages filtered by department, newest first
+        IndexModel(
+            [
+                ("creator_dept", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ],
+            name="creator_dept_1_created_at_-1__id_-1",
+        ),
+    ],
+}
+
 
 class Project:
     @staticmethod
@@ -29,6 +52,7 @@ class Project:
 
             # Insert project
             result = projects_collection.insert_one(data)
+            DailyMetrics.record("project", user_id=data.get("created_by"))
             return result.inserted_id
 
         except Exception as e:
@@ -62,6 +86,18 @@ class Project:
             # Get projects
             projects = list(projects_collection.find(query))
 
+            # Fetch every collaborator's details in one batch
+            collaborator_ids = []
+            for project in projects:
+                for collab in project.get("collaborators") or []:
+                    if isinstance(collab, dict):
+                        collaborator_ids.append(
+                            collab.get("id") or collab.get("user_id")
+                        )
+                    elif isinstance(collab, (ObjectId, str)):
+                        collaborator_ids.append(collab)
+            users = user_summaries.get_many(collaborator_ids)
+
             # Process projects
             for project in projects:
                 # Convert ObjectId to string
@@ -95,15 +131,7 @@ class Project:
 
                         # Get collaborator details
                         if collab_id:
-                            # Convert string to ObjectId if needed
-                            if isinstance(collab_id, str):
-                                try:
-                                    collab_id = ObjectId(collab_id)
-                                except:
-                                    pass
-
-                            # Look up user details
-                            user = users_collection.find_one({"_id": collab_id})
+                            user = users.get(str(collab_id))
                             if user:
                                 collab_info.update(
                                     {
@@ -316,3 +344,31 @@ class Project:
         except Exception as e:
             logger.error(f"Error updating module files: {str(e)}")
             return False
+
+    @staticmethod
+    def backfill_creator_dept():
+        """
+        Copy each creator's department onto projects created before
+        creator_dept was stored, so explore filters can use it.
+
+        Returns:
+            int: Number of projects updated
+        """
+        updated = 0
+        creator_ids = projects_collection.distinct(
+            "created_by", {"creator_dept": {"$exists": False}}
+        )
+        creators = user_summaries.get_many(creator_ids)
+
+        for creator_id in creator_ids:
+            creator = creators.get(str(creator_id))
+            if not creator:
+                continue
+
+            result = projects_collection.update_many(
+                {"created_by": creator_id, "creator_dept": {"$exists": False}},
+                {"$set": {"creator_dept": creator.get("dept")}},
+            )
+            updated += result.modified_count
+
+        return updated
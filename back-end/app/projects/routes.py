@@ -6,6 +6,7 @@ from app.auth.models import User
 from app.utils.validators import validate_user_input, validate_file_type
 from app.utils.helpers import save_uploaded_file
 from bson import ObjectId
+import click
 import os
 from flask.json import JSONEncoder
 from datetime import datetime
@@ -41,6 +42,7 @@ def create_project():
             "modules": data.get("modules", []),
             "progress": data.get("progress", 0),
             "created_by": user["_id"],
+            "creator_dept": user.get("dept"),
         }
 
         project_id = Project.create(project_data)
@@ -381,3 +383,10 @@ def get_all_projects():
 
         current_app.logger.error(traceback.format_exc())
         return jsonify({"message": f"Failed to fetch all projects: {str(e)}"}), 500
+
+
+@projects_bp.cli.command("backfill-creator-dept")
+def backfill_creator_dept():
+    """Store the creator's department on projects that lack it."""
+    updated = Project.backfill_creator_dept()
+    click.echo(f"Updated {updated} projects")
@@ -0,0 +1,190 @@
+from collections import OrderedDict
+from bson import ObjectId
+from app.models.base import users_collection
+import threading
+import time
+
+# Fields returned for user summaries shared across models
+USER_SUMMARY_PROJECTION = {
+    "name": 1,
+    "email": 1,
+    "role": 1,
+    "dept": 1,
+    "batch": 1,
+    "photo_url": 1,
+    "staff_id": 1,
+}
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry TTL and LRU eviction."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return a cached value, or default if missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+
+            if item is None or item[1] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        """Remove a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Return size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class UserSummaryCache:
+    """
+    Cache of small user projections (name, email, role, dept, ...).
+
+    Lookups by ID or email are served from memory and misses are fetched in
+    a single $in query. Entries must be invalidated when a user's profile
+    changes.
+    """
+
+    def __init__(self, maxsize=5000, ttl=300):
+        self._by_id = TTLCache(maxsize, ttl)
+        self._ids_by_email = TTLCache(maxsize, ttl)
+
+    def get(self, user_id):
+        """
+        Get a single user summary.
+
+        Args:
+            user_id: User ID (str or ObjectId)
+
+        Returns:
+            dict: User summary or None
+        """
+        return self.get_many([user_id]).get(str(user_id))
+
+    def get_many(self, user_ids):
+        """
+        Get user summaries for many IDs.
+
+        Args:
+            user_ids: Iterable of user IDs (str or ObjectId)
+
+        Returns:
+            dict: User summaries keyed by string ID
+        """
+        result = {}
+        missing = []
+
+        for user_id in {str(user_id) for user_id in user_ids if user_id}:
+            summary = self._by_id.get(user_id)
+            if summary is not None:
+                result[user_id] = dict(summary)
+            elif ObjectId.is_valid(user_id):
+                missing.append(ObjectId(user_id))
+
+        if missing:
+            for summary in self._fetch({"_id": {"$in": missing}}):
+                result[summary["_id"]] = dict(summary)
+
+        return result
+
+    def get_many_by_email(self, emails):
+        """
+        Get user summaries for many emails.
+
+        Args:
+            emails: Iterable of emails
+
+        Returns:
+            dict: User summaries keyed by email
+        """
+        result = {}
+        missing = []
+
+        for email in {email for email in emails if email}:
+            user_id = self._ids_by_email.get(email)
+            summary = self._by_id.get(user_id) if user_id else None
+            if summary is not None:
+                result[email] = dict(summary)
+            else:
+                missing.append(email)
+
+        if missing:
+            for summary in self._fetch({"email": {"$in": missing}}):
+                result[summary["email"]] = dict(summary)
+
+        return result
+
+    def invalidate(self, user_id=None, email=None):
+        """
+        Drop a cached user summary.
+
+        Args:
+            user_id: User ID (optional)
+            email: User email (optional)
+        """
+        if email:
+            user_id = user_id or self._ids_by_email.get(email)
+            self._ids_by_email.pop(email)
+        if user_id:
+            self._by_id.pop(str(user_id))
+
+    def clear(self):
+        """Drop all cached summaries."""
+        self._by_id.clear()
+        self._ids_by_email.clear()
+
+    def stats(self):
+        """Return hit/miss counters for the ID cache."""
+        return self._by_id.stats()
+
+    def _fetch(self, query):
+        """Load summaries matching a query and store them in the cache."""
+        summaries = []
+        for user in users_collection.find(query, USER_SUMMARY_PROJECTION):
+            user["_id"] = str(user["_id"])
+            self._by_id.set(user["_id"], user)
+            if user.get("email"):
+                self._ids_by_email.set(user["email"], user["_id"])
+            summaries.append(user)
+
+        return summaries
+
+
+# Shared instance used by all models
+user_summaries = UserSummaryCache()
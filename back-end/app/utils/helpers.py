@@ -1,6 +1,8 @@
 from datetime import datetime
+import base64
 import os
 from bson import ObjectId
+from pymongo import DESCENDING
 from werkzeug.utils import secure_filename
 from flask import current_app
 from PIL import Image
@@ -106,3 +108,61 @@ def mongo_to_json_serializable(obj):
     else:
         # Return everything else as is
         return obj
+
+
+def encode_cursor(value, object_id):
+    """
+    Encode a keyset pagination cursor.
+
+    Args:
+        value: Sort key value of the last item on the page (datetime or str)
+        object_id: _id of the last item on the page
+
+    Returns:
+        str: Opaque URL-safe cursor
+    """
+    if isinstance(value, datetime):
+        raw = f"{value.isoformat()}|{object_id}"
+    else:
+        raw = f"s:{value}|{object_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Opaque cursor string
+
+    Returns:
+        tuple: (datetime or str, ObjectId)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        value, object_id = raw.rsplit("|", 1)
+        if value.startswith("s:"):
+            return value[2:], ObjectId(object_id)
+        return datetime.fromisoformat(value), ObjectId(object_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_filter(field, cursor, direction=DESCENDING):
+    """
+    Build a query clause selecting documents after a decoded cursor.
+
+    Args:
+        field: Sort field paired with _id as tie-breaker
+        cursor: Tuple returned by decode_cursor
+        direction: Sort direction of the page (DESCENDING or ASCENDING)
+
+    Returns:
+        dict: MongoDB filter clause
+    """
+    value, object_id = cursor
+    op = "$lt" if direction == DESCENDING else "$gt"
+    return {"$or": [{field: {op: value}}, {field: value, "_id": {op: object_id}}]}
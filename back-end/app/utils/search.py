@@ -0,0 +1,150 @@
+import re
+import unicodedata
+
+# Longest token prefix stored; longer query tokens match through n-grams
+MAX_PREFIX_LENGTH = 12
+NGRAM_SIZE = 3
+
+# Marks n-gram keys so they never collide with short prefixes
+NGRAM_MARKER = "~"
+
+# Bumped whenever build_search_keys changes, so stored keys are rebuilt
+SEARCH_KEYS_VERSION = 2
+
+_TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(value):
+    """Lowercase and strip accents so "José" and "jose" compare equal."""
+    value = unicodedata.normalize("NFKD", value or "")
+    return "".join(c for c in value if not unicodedata.combining(c)).lower().strip()
+
+
+def tokenize(value):
+    """Split normalized text into alphanumeric tokens."""
+    return [token for token in _TOKEN_SPLIT.split(normalize_text(value)) if token]
+
+
+def build_search_keys(name, email):
+    """
+    Build the typeahead keys stored on a user document.
+
+    Every name token, the email local part (whole and split on
+    punctuation) and the email domain tokens contribute their prefixes up
+    to MAX_PREFIX_LENGTH plus their n-grams, so one multikey index serves
+    prefix and infix lookups, including full-email queries.
+
+    Args:
+        name: User's display name
+        email: User's email
+
+    Returns:
+        list: Sorted unique keys
+    """
+    local_part = normalize_text(email).split("@", 1)[0]
+    tokens = set(tokenize(name)) | set(tokenize(email))
+    if local_part:
+        tokens.add(local_part)
+
+    keys = set()
+    for token in tokens:
+        for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1):
+            keys.add(token[:length])
+        keys.update(NGRAM_MARKER + ngram for ngram in ngrams(token))
+
+    return sorted(keys)
+
+
+def ngrams(token):
+    """Return the n-grams of a token, or none if it is too short."""
+    return {token[i : i + NGRAM_SIZE] for i in range(len(token) - NGRAM_SIZE + 1)}
+
+
+def search_key_clauses(query):
+    """
+    Build one filter clause per query token against search_keys.
+
+    A token matches a stored prefix directly; tokens of NGRAM_SIZE or more
+    also match when all their n-grams are present (infix matches).
+
+    Args:
+        query: Raw search text
+
+    Returns:
+        list: MongoDB clauses to combine with $and
+    """
+    clauses = []
+    for token in tokenize(query):
+        options = []
+        if len(token) <= MAX_PREFIX_LENGTH:
+            options.append({"search_keys": token})
+        if len(token) >= NGRAM_SIZE:
+            options.append(
+                {"search_keys": {"$all": [NGRAM_MARKER + g for g in ngrams(token)]}}
+            )
+        clauses.append(options[0] if len(options) == 1 else {"$or": options})
+    return clauses
+
+
+def rank_expression(query):
+    """
+    Build an aggregation expression scoring a user document like
+    rank_match, so candidates can be ranked before they are truncated.
+
+    Args:
+        query: Raw search text
+
+    Returns:
+        dict: MongoDB expression evaluating to the score
+    """
+    query = normalize_text(query)
+    name = {"$ifNull": ["$name", ""]}
+    email = {"$ifNull": ["$email", ""]}
+
+    def matches(field, pattern):
+        return {"$regexMatch": {"input": field, "regex": pattern, "options": "i"}}
+
+    word_prefixes = [
+        matches(name, f"(^|[^a-z0-9]){re.escape(token)}") for token in tokenize(query)
+    ]
+
+    branches = [
+        {"case": {"$eq": [{"$toLower": name}, query]}, "then": 100},
+        {"case": matches(name, "^" + re.escape(query)), "then": 80},
+    ]
+    if word_prefixes:
+        branches.append({"case": {"$and": word_prefixes}, "then": 60})
+    branches.append({"case": matches(email, "^" + re.escape(query)), "then": 50})
+
+    return {"$switch": {"branches": branches, "default": 20}}
+
+
+def rank_match(query, name, email):
+    """
+    Score how well a user matches a typeahead query; higher is better.
+
+    Args:
+        query: Raw search text
+        name: User's display name
+        email: User's email
+
+    Returns:
+        int: Score
+    """
+    query = normalize_text(query)
+    name = normalize_text(name)
+    email = normalize_text(email)
+    name_tokens = tokenize(name)
+    query_tokens = tokenize(query)
+
+    if name == query:
+        return 100
+    if name.startswith(query):
+        return 80
+    if query_tokens and all(
+        any(token.startswith(q) for token in name_tokens) for q in query_tokens
+    ):
+        return 60
+    if email.startswith(query):
+        return 50
+    return 20
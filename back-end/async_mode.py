@@ -0,0 +1,26 @@
+import os
+from dotenv import load_dotenv
+
+
+def patch_for_async_mode():
+    """
+    Monkey patch the standard library for the configured Socket.IO async
+    mode. Must run before anything imports pymongo, socket or threading,
+    so call it at the very top of the entry point, before importing app.
+
+    Returns:
+        str: The async mode in use
+    """
+    load_dotenv()
+    async_mode = os.getenv("SOCKETIO_ASYNC_MODE", "threading")
+
+    if async_mode == "gevent":
+        from gevent import monkey
+
+        monkey.patch_all()
+    elif async_mode == "eventlet":
+        import eventlet
+
+        eventlet.monkey_patch()
+
+    return async_mode
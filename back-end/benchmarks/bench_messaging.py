@@ -0,0 +1,238 @@
+"""
+Load benchmark comparing Socket.IO async modes on the messaging paths.
+
+For each mode a gunicorn server is started with gunicorn.conf.py, then:
+
+  * GET /api/conversations is hit by concurrent HTTP clients
+  * send_message is emitted by concurrent Socket.IO clients, timing each
+    message until its new_message echo arrives
+
+Usage (from back-end/, with MongoDB running and test data in place):
+
+    python benchmarks/bench_messaging.py --email alice@example.com \\
+        --conversation <conversation_id> --modes threading gevent
+
+The socket benchmark needs the Socket.IO client extras:
+    pip install "python-socketio[client]"
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_token(email):
+    """Create an access token for email using the app's JWT settings."""
+    sys.path.insert(0, BACKEND_DIR)
+    # Signing a token needs no student registry
+    os.environ.setdefault("STUDENT_INDEX_PRELOAD", "false")
+    from app import create_app
+    from flask_jwt_extended import create_access_token
+
+    app = create_app(os.getenv("FLASK_CONFIG") or "default")
+    with app.app_context():
+        return create_access_token(identity=email)
+
+
+def start_server(mode, port, workers):
+    """Start gunicorn in the given async mode and wait until it answers."""
+    env = dict(
+        os.environ,
+        SOCKETIO_ASYNC_MODE=mode,
+        PORT=str(port),
+        GUNICORN_WORKERS=str(workers),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except Exception:
+            time.sleep(0.5)
+
+    server.terminate()
+    raise RuntimeError(f"Server in {mode} mode did not start")
+
+
+def summarize(latencies, elapsed, errors):
+    """Build a result row from per-request latencies in seconds."""
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"ok": 0, "errors": errors, "rps": 0, "p50_ms": 0, "p95_ms": 0}
+
+    return {
+        "ok": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def bench_conversations(base_url, token, total, concurrency):
+    """Time GET /api/conversations under concurrent load."""
+
+    def fetch(_):
+        req = urllib.request.Request(
+            f"{base_url}/api/conversations",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        start = time.perf_counter()
+        with urllib.request.urlopen(req, timeout=30) as response:
+            response.read()
+        return time.perf_counter() - start
+
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(fetch, i) for i in range(total)]:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def bench_send_message(base_url, email, conversation_id, total, concurrency):
+    """Time send_message round trips from concurrent Socket.IO clients."""
+    try:
+        import socketio
+    except ImportError:
+        return None
+
+    per_client = max(1, total // concurrency)
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def run_client(client_index):
+        nonlocal errors
+        client = socketio.Client()
+        pending = {}
+        done = threading.Event()
+
+        @client.on("new_message")
+        def on_message(message):
+            sent_at = pending.pop(message.get("text"), None)
+            if sent_at is not None:
+                with lock:
+                    latencies.append(time.perf_counter() - sent_at)
+            if not pending:
+                done.set()
+
+        try:
+            client.connect(base_url, transports=["websocket"])
+            client.emit("login", {"email": email})
+            client.emit(
+                "join_conversation",
+                {"conversation_id": conversation_id, "email": email},
+            )
+            time.sleep(0.5)
+
+            for i in range(per_client):
+                text = f"bench {client_index}-{i} {time.time()}"
+                pending[text] = time.perf_counter()
+                client.emit(
+                    "send_message",
+                    {
+                        "email": email,
+                        "conversation_id": conversation_id,
+                        "text": text,
+                    },
+                )
+
+            done.wait(timeout=60)
+        except Exception:
+            pass
+        finally:
+            with lock:
+                errors += len(pending)
+            client.disconnect()
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=run_client, args=(i,)) for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--email", required=True, help="Existing user email")
+    parser.add_argument(
+        "--conversation", required=True, help="Conversation the user belongs to"
+    )
+    parser.add_argument("--modes", nargs="+", default=["threading", "gevent"])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--socket-clients", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    token = make_token(args.email)
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = []
+
+    for mode in args.modes:
+        server = start_server(mode, args.port, args.workers)
+        try:
+            results.append(
+                (
+                    mode,
+                    "GET /api/conversations",
+                    bench_conversations(
+                        base_url, token, args.requests, args.concurrency
+                    ),
+                )
+            )
+            socket_result = bench_send_message(
+                base_url,
+                args.email,
+                args.conversation,
+                args.messages,
+                args.socket_clients,
+            )
+            if socket_result is None:
+                print("python-socketio client not installed; skipping send_message")
+            else:
+                results.append((mode, "socket send_message", socket_result))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(
+        f"{'mode':<10} {'path':<24} {'ok':>6} {'err':>5} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8}"
+    )
+    for mode, path, row in results:
+        print(
+            f"{mode:<10} {path:<24} {row['ok']:>6} {row['errors']:>5} "
+            f"{row['rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import multiprocessing
+import os
+
+# Run with: gunicorn -c gunicorn.conf.py wsgi:app
+#
+# With more than one worker, Socket.IO needs sticky sessions at the load
+# balancer and SOCKETIO_MESSAGE_QUEUE set so broadcasts reach every worker.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+
+async_mode = os.environ.setdefault("SOCKETIO_ASYNC_MODE", "gevent")
+if async_mode == "gevent":
+    worker_class = "gevent"
+    worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+elif async_mode == "eventlet":
+    worker_class = "eventlet"
+    worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+else:
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# The worker patches the standard library itself after forking, so the app
+# must not be imported in the master first
+preload_app = False
+
+# Split the MongoDB connection budget across workers so the total stays
+# within what the server allows
+max_connections = int(os.environ.get("MONGO_MAX_CONNECTIONS", 400))
+os.environ.setdefault("MONGO_MAX_POOL_SIZE", str(max(10, max_connections // workers)))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+accesslog = "-"
@@ -1,3 +1,7 @@
+from async_mode import patch_for_async_mode
+
+patch_for_async_mode()
+
 import os
 from app import create_app, socketio
 